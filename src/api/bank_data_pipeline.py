@@ -13,14 +13,21 @@ utilities defined in ``src/api/get_bank_trx.py`` so the CLI and web tier can:
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
+import functools
 import json
 import logging
+import math
 import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-
-from dotenv import load_dotenv
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
 import plaid
 from plaid.model.country_code import CountryCode
@@ -38,10 +45,18 @@ try:
         default_token_store_path,
         determine_date_range,
         exchange_public_token,
+        fetch_accounts_for_token,
         fetch_transactions_for_token,
+        filter_transactions,
+        is_valid_access_token,
+        load_environment,
+        read_sync_cursor,
+        read_token_store,
         resolve_access_token,
         serialize_transactions,
         store_access_token,
+        store_sync_cursor,
+        sync_transactions_for_token,
     )
 except ImportError:
     from get_bank_trx import (  # type: ignore
@@ -53,25 +68,114 @@ except ImportError:
         default_token_store_path,
         determine_date_range,
         exchange_public_token,
+        fetch_accounts_for_token,
         fetch_transactions_for_token,
+        filter_transactions,
+        is_valid_access_token,
+        load_environment,
+        read_sync_cursor,
+        read_token_store,
         resolve_access_token,
         serialize_transactions,
         store_access_token,
+        store_sync_cursor,
+        sync_transactions_for_token,
     )
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+_TX_SORT_KEY = itemgetter("date", "transaction_id")
+
+
+@functools.lru_cache(maxsize=None)
+def _plaid_fetch_slots() -> threading.BoundedSemaphore:
+    """
+    Process-wide cap on in-flight Plaid transaction fetches, so multi-item and
+    multi-user fan-out stays under the client's rate limit. Held around every
+    fetch_transactions_for_token call made by the pipeline (get_transactions,
+    and so the one-click downloads, plus get_transactions_all_items).
+
+    Created on first use so PLAID_MAX_CONCURRENT_FETCHES can come from ``.env``.
+    """
+    load_environment()
+    return threading.BoundedSemaphore(int(os.getenv("PLAID_MAX_CONCURRENT_FETCHES", "4")))
+
+
+def _dumps_json(payload: Any) -> str:
+    """Serialise ``payload`` as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def _dumps_json_bytes(payload: Any) -> bytes:
+    """Like :func:`_dumps_json` but returns UTF-8 bytes (orjson's native output)."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+@contextlib.contextmanager
+def _atomic_output(target: Path, mode: str = "w") -> Iterator[IO[Any]]:
+    """
+    Open a sibling temp file for writing and rename it over ``target`` only once
+    the block succeeds, so a failed download never truncates an existing export.
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        kwargs: Dict[str, Any] = {} if "b" in mode else {"encoding": "utf-8", "newline": ""}
+        with os.fdopen(fd, mode, **kwargs) as handle:
+            yield handle
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _write_stdout_bytes(data: bytes) -> None:
+    """Write ``data`` plus a newline to stdout, bypassing the text layer when possible."""
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        print(data.decode("utf-8"))
+        return
+    sys.stdout.flush()
+    buffer.write(data + b"\n")
+    buffer.flush()
+
+
+_TXT_SEPARATOR = "=" * 80
+_TXT_HEADER_TEMPLATE = "Bank Transactions Report - Generated %s"
+_TXT_ROW_TEMPLATE = "%3d. %s | %-30s | $%8.2f"
+_TXT_ROW_FIELDS = itemgetter("date", "name", "amount")
+
+
+def _format_txt_block(index: int, txn: Dict[str, Any]) -> str:
+    """Render one transaction of the TXT report, including its trailing blank line."""
+    block = _TXT_ROW_TEMPLATE % ((index,) + _TXT_ROW_FIELDS(txn))
+    if txn.get("account_name"):
+        block += "\n     Account: %s" % txn["account_name"]
+    if txn.get("category"):
+        block += "\n     Category: %s" % ", ".join(txn["category"])
+    return block + "\n"
 
 
 class BankDataPipeline:
     """High-level Plaid workflow helper."""
 
+    _shared: Optional["BankDataPipeline"] = None
+    _shared_lock = threading.Lock()
+
     def __init__(self, token_store_path: Optional[Path] = None):
-        project_root = Path(__file__).resolve().parents[2]
-        env_file = project_root / ".env"
-        if env_file.exists():
-            load_dotenv(env_file)
-        load_dotenv()
+        load_environment()
 
         self.credentials: PlaidCredentials = create_plaid_client()
         self.client = self.credentials.client
@@ -79,6 +183,24 @@ class BankDataPipeline:
         self.token_store_path = token_store_path or default_token_store_path()
         logger.info("BankDataPipeline ready (env=%s, token_store=%s)", self.environment, self.token_store_path)
 
+    @classmethod
+    def get_shared(cls) -> "BankDataPipeline":
+        """
+        Return a process-wide pipeline, creating it on first use.
+
+        The generated Plaid client is safe to share across threads, so web
+        workers should reuse this instance rather than build one per request.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @functools.cached_property
+    def account_filters(self) -> Dict[str, List[str]]:
+        """Account filters from the environment, read once per pipeline instance."""
+        return build_account_filters()
+
     # ------------------------------------------------------------------ #
     # Plaid Link helpers
 
@@ -160,7 +282,7 @@ class BankDataPipeline:
         """
         Retrieve and summarise transactions for the configured Plaid item.
         """
-        filters = build_account_filters()
+        filters = self.account_filters
         start, end = determine_date_range(days_back=days_back, start_date=start_date, end_date=end_date)
 
         if access_token:
@@ -175,16 +297,17 @@ class BankDataPipeline:
                 token_store_path=self.token_store_path,
             )
 
-        transactions, accounts = fetch_transactions_for_token(
-            self.credentials,
-            access_token,
-            start,
-            end,
-            filters,
-        )
+        with _plaid_fetch_slots():
+            transactions, accounts = fetch_transactions_for_token(
+                self.credentials,
+                access_token,
+                start,
+                end,
+                filters,
+            )
 
         records = serialize_transactions(transactions, accounts)
-        records.sort(key=lambda row: (row["date"], row["transaction_id"]))
+        records.sort(key=_TX_SORT_KEY)
 
         summary = {
             "transactions": records,
@@ -193,7 +316,7 @@ class BankDataPipeline:
             "start_date": start.isoformat(),
             "end_date": end.isoformat(),
             "total_transactions": len(records),
-            "total_amount": sum(row["amount"] for row in records),
+            "total_amount": math.fsum(row["amount"] for row in records),
         }
         logger.info(
             "Retrieved %s transactions (%s to %s) using item %s",
@@ -204,6 +327,114 @@ class BankDataPipeline:
         )
         return summary
 
+    def sync_transactions(self, item_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch only what changed since the last sync for an item (/transactions/sync).
+
+        The cursor is kept in the token store under ``cursors``, keyed by item id; the
+        first sync for an item returns its full history. Account filters apply as in
+        ``get_transactions``.
+        """
+        access_token, item_id, token_source = resolve_access_token(
+            self.credentials,
+            preferred_item_id=item_id,
+            token_store_path=self.token_store_path,
+        )
+        accounts, token_item_id = fetch_accounts_for_token(self.credentials, access_token)
+        item_id = item_id or token_item_id
+        if not item_id:
+            raise PlaidAccessTokenError("Unable to determine the Plaid item for this access token; sync cursors are stored per item.")
+        cursor = read_sync_cursor(item_id, self.token_store_path)
+
+        added, modified, removed, next_cursor = sync_transactions_for_token(self.credentials, access_token, cursor)
+        store_sync_cursor(item_id, next_cursor, self.token_store_path)
+        filters = self.account_filters
+        added = filter_transactions(added, accounts, filters)
+        modified = filter_transactions(modified, accounts, filters)
+
+        logger.info(
+            "Synced item %s: %s added, %s modified, %s removed",
+            item_id,
+            len(added),
+            len(modified),
+            len(removed),
+        )
+        return {
+            "added": serialize_transactions(added, accounts),
+            "modified": serialize_transactions(modified, accounts),
+            "removed": removed,
+            "item_id": item_id,
+            "access_token_source": token_source,
+            "initial_sync": cursor is None,
+        }
+
+    def get_transactions_all_items(
+        self,
+        days_back: int = 90,
+        *,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """
+        Retrieve and summarise transactions for every item in the token store.
+
+        Items are fetched concurrently. An item that fails is logged and listed
+        under ``failed_items``; the call only raises when every item fails.
+        """
+        filters = self.account_filters
+        start, end = determine_date_range(days_back=days_back, start_date=start_date, end_date=end_date)
+
+        store = read_token_store(self.token_store_path)
+        tokens = {
+            item_id: token
+            for item_id, token in (store.get("items") or {}).items()
+            if is_valid_access_token(token)
+        }
+        if not tokens:
+            raise PlaidAccessTokenError("No stored Plaid items found. Run the Plaid Link flow to add one.")
+
+        def fetch(access_token: str) -> List[Dict[str, Any]]:
+            with _plaid_fetch_slots():
+                transactions, accounts = fetch_transactions_for_token(
+                    self.credentials, access_token, start, end, filters
+                )
+            return serialize_transactions(transactions, accounts)
+
+        records: List[Dict[str, Any]] = []
+        failed_items: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=min(8, len(tokens))) as executor:
+            futures = {executor.submit(fetch, token): item_id for item_id, token in tokens.items()}
+            for future in as_completed(futures):
+                item_id = futures[future]
+                try:
+                    records.extend(future.result())
+                except Exception as exc:
+                    # One bad item must not discard the others' results.
+                    logger.warning("Failed to fetch transactions for item %s: %s", item_id, exc)
+                    failed_items[item_id] = str(exc)
+
+        if len(failed_items) == len(tokens):
+            raise RuntimeError(f"Failed to fetch transactions for all {len(tokens)} Plaid item(s).")
+
+        records.sort(key=_TX_SORT_KEY)
+        summary = {
+            "transactions": records,
+            "item_ids": sorted(set(tokens) - set(failed_items)),
+            "failed_items": failed_items,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "total_transactions": len(records),
+            "total_amount": math.fsum(row["amount"] for row in records),
+        }
+        logger.info(
+            "Retrieved %s transactions (%s to %s) across %s item(s)",
+            summary["total_transactions"],
+            summary["start_date"],
+            summary["end_date"],
+            len(summary["item_ids"]),
+        )
+        return summary
+
     # ------------------------------------------------------------------ #
     # Formatting helpers
 
@@ -211,50 +442,82 @@ class BankDataPipeline:
         self,
         transactions: List[Dict[str, Any]],
         format_type: str = "json",
-    ) -> Tuple[str, str]:
+        *,
+        sink: Optional[TextIO] = None,
+        generated_at: Optional[datetime] = None,
+        total_amount: Optional[float] = None,
+        as_bytes: bool = False,
+    ) -> Tuple[Union[str, bytes], str]:
         """
         Convert transactions to the requested format.
+
+        When ``sink`` is given the output is written to it directly (CSV rows are
+        streamed one at a time) and the returned data string is empty.
+        ``generated_at`` stamps the TXT/JSON output; it defaults to now.
+        ``total_amount`` may be passed when the caller already summed the
+        amounts (``get_transactions`` does) to skip another pass over the rows.
+        With ``as_bytes`` the data is returned UTF-8 encoded; the JSON branch then
+        skips the decode/re-encode round trip entirely. Ignored when ``sink`` is set.
         """
         format_type = (format_type or "json").lower()
         if format_type == "csv":
             import csv
             import io
 
-            buffer = io.StringIO()
+            target = sink if sink is not None else io.StringIO()
             if transactions:
-                writer = csv.DictWriter(buffer, fieldnames=sorted(transactions[0].keys()))
-                writer.writeheader()
-                writer.writerows(transactions)
-            return buffer.getvalue(), "csv"
+                fieldnames = sorted(transactions[0].keys())
+                writer = csv.writer(target)
+                writer.writerow(fieldnames)
+                # Missing keys become empty cells, as DictWriter's restval="" did, so partial rows never abort the stream.
+                writer.writerows([row.get(field, "") for field in fieldnames] for row in transactions)
+            if sink is not None:
+                return "", "csv"
+            return self._encode(target.getvalue(), as_bytes), "csv"
+
+        if generated_at is None:
+            generated_at = datetime.now()
+        if total_amount is None:
+            total_amount = math.fsum(txn["amount"] for txn in transactions)
 
         if format_type == "txt":
-            lines: List[str] = []
-            lines.append(f"Bank Transactions Report - Generated {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            lines.append("=" * 80)
-            lines.append("")
-            total_amount = 0.0
-            for index, txn in enumerate(transactions, 1):
-                total_amount += txn["amount"]
-                lines.append(f"{index:3d}. {txn['date']} | {txn['name']:<30} | ${txn['amount']:>8.2f}")
-                if txn.get("account_name"):
-                    lines.append(f"     Account: {txn['account_name']}")
-                if txn.get("category"):
-                    lines.append(f"     Category: {', '.join(txn['category'])}")
-                lines.append("")
-            lines.append("=" * 80)
+            lines: List[str] = [
+                _TXT_HEADER_TEMPLATE % generated_at.strftime("%Y-%m-%d %H:%M:%S"),
+                _TXT_SEPARATOR,
+                "",
+            ]
+            lines.extend([_format_txt_block(index, txn) for index, txn in enumerate(transactions, 1)])
+            lines.append(_TXT_SEPARATOR)
             lines.append(f"Total transactions: {len(transactions)}")
             lines.append(f"Total amount: ${total_amount:.2f}")
-            return "\n".join(lines), "txt"
+            report = "\n".join(lines)
+            if sink is not None:
+                return self._emit(report, sink), "txt"
+            return self._encode(report, as_bytes), "txt"
 
         payload = {
             "metadata": {
-                "generated_at": datetime.now().isoformat(),
+                "generated_at": generated_at.isoformat(),
                 "total_transactions": len(transactions),
-                "total_amount": sum(txn["amount"] for txn in transactions),
+                "total_amount": total_amount,
             },
             "transactions": transactions,
         }
-        return json.dumps(payload, indent=2), "json"
+        if as_bytes and sink is None:
+            return _dumps_json_bytes(payload), "json"
+        return self._emit(_dumps_json(payload), sink), "json"
+
+    @staticmethod
+    def _encode(data: str, as_bytes: bool) -> Union[str, bytes]:
+        return data.encode("utf-8") if as_bytes else data
+
+    @staticmethod
+    def _emit(data: str, sink: Optional[TextIO]) -> str:
+        """Write ``data`` to ``sink`` when provided, otherwise hand it back."""
+        if sink is None:
+            return data
+        sink.write(data)
+        return ""
 
     def one_click_download(
         self,
@@ -265,9 +528,14 @@ class BankDataPipeline:
         public_token: Optional[str] = None,
         access_token: Optional[str] = None,
         item_id: Optional[str] = None,
+        sink: Optional[TextIO] = None,
+        as_bytes: bool = False,
     ) -> Dict[str, Any]:
         """
         Complete pipeline: (optionally) exchange token, fetch transactions, format output.
+
+        Pass ``sink`` to stream the formatted output straight to an open file, or
+        ``as_bytes`` to get ``data`` back as UTF-8 bytes.
         """
         metadata: Optional[Dict[str, Any]] = None
         if public_token:
@@ -276,14 +544,19 @@ class BankDataPipeline:
             metadata = self.store_access_token(access_token, item_id=item_id, source="manual")
 
         item_hint = (metadata or {}).get("item_id") or item_id
+        now = datetime.now()
 
         transactions_summary = self.get_transactions(days_back=days_back, item_id=item_hint)
         formatted_data, file_extension = self.format_transactions_for_download(
             transactions_summary["transactions"],
             format_type=format_type,
+            sink=sink,
+            generated_at=now,
+            total_amount=transactions_summary["total_amount"],
+            as_bytes=as_bytes,
         )
 
-        filename = f"bank_transactions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{file_extension}"
+        filename = f"bank_transactions_{now.strftime('%Y%m%d_%H%M%S')}.{file_extension}"
 
         return {
             "success": True,
@@ -292,16 +565,53 @@ class BankDataPipeline:
             "metadata": {
                 "user_id": user_id,
                 "format": format_type,
-                "generated_at": datetime.now().isoformat(),
+                "generated_at": now.isoformat(),
                 **{k: v for k, v in transactions_summary.items() if k != "transactions"},
             },
         }
 
+    async def aone_click_download(
+        self,
+        *,
+        user_id: str,
+        days_back: int = 90,
+        format_type: str = "json",
+        public_token: Optional[str] = None,
+        access_token: Optional[str] = None,
+        item_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of :meth:`one_click_download`.
+
+        The Plaid SDK is synchronous, so the pipeline runs in the loop's default
+        executor and the event loop stays free while Plaid round-trips are in flight.
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(
+            self.one_click_download,
+            user_id=user_id,
+            days_back=days_back,
+            format_type=format_type,
+            public_token=public_token,
+            access_token=access_token,
+            item_id=item_id,
+        )
+        return await loop.run_in_executor(None, call)
+
+    async def aone_click_download_many(self, user_ids: Iterable[str], **kwargs: Any) -> List[Dict[str, Any]]:
+        """
+        Run :meth:`aone_click_download` for several users concurrently.
+
+        Keyword arguments are forwarded to every download; results keep the order of ``user_ids``.
+        """
+        return list(await asyncio.gather(*(self.aone_click_download(user_id=uid, **kwargs) for uid in user_ids)))
+
 
 # ---------------------------------------------------------------------- #
 # CLI
 
 def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     parser = argparse.ArgumentParser(description="Plaid one-click bank data pipeline.")
     parser.add_argument("--link", nargs="?", const="demo_user_123", help="Create a Plaid link token for the given user id.")
     parser.add_argument("--exchange", help="Exchange a Plaid public token for an access token.")
@@ -350,12 +660,12 @@ def main(argv: Optional[List[str]] = None) -> int:
 
         if tasks[0] == "exchange":
             metadata = pipeline.exchange_public_token(args.exchange, item_id=args.item_id)
-            print(json.dumps(metadata, indent=2))
+            print(_dumps_json(metadata))
             return 0
 
         if tasks[0] == "store":
             metadata = pipeline.store_access_token(args.store_access, item_id=args.item_id, source="manual")
-            print(json.dumps(metadata, indent=2))
+            print(_dumps_json(metadata))
             return 0
 
         if tasks[0] == "download":
@@ -365,19 +675,26 @@ def main(argv: Optional[List[str]] = None) -> int:
             elif args.access_token:
                 metadata = pipeline.store_access_token(args.access_token, item_id=args.item_id, source="manual")
 
-            result = pipeline.one_click_download(
+            download_kwargs = dict(
                 user_id="cli_user",
                 days_back=args.days,
                 format_type=args.format,
                 item_id=(metadata or {}).get("item_id") or args.item_id,
             )
 
-            if args.output:
-                args.output.write_text(result["data"])
+            if args.output and args.format == "json":
+                result = pipeline.one_click_download(as_bytes=True, **download_kwargs)
+                with _atomic_output(args.output, "wb") as handle:
+                    handle.write(result["data"])
+                print(f"Wrote {args.format.upper()} data to {args.output}")
+            elif args.output:
+                with _atomic_output(args.output) as handle:
+                    result = pipeline.one_click_download(sink=handle, **download_kwargs)
                 print(f"Wrote {args.format.upper()} data to {args.output}")
             else:
-                print(result["data"])
-            print(json.dumps(result["metadata"], indent=2))
+                result = pipeline.one_click_download(as_bytes=True, **download_kwargs)
+                _write_stdout_bytes(result["data"])
+            print(_dumps_json(result["metadata"]))
             return 0
 
     except (PlaidConfigurationError, PlaidAccessTokenError, ValueError) as exc:
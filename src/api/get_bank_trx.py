@@ -8,30 +8,54 @@ from the command line to fetch transactions and cache them in ``data/``.
 from __future__ import annotations
 
 import argparse
+import copy
+import functools
 import json
 import logging
+import math
 import os
 import re
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
+from operator import attrgetter, itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
-import plaid
-from dotenv import load_dotenv
-from plaid.api import plaid_api
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.model.transactions_get_request import TransactionsGetRequest
-from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
+# plaid (~100 ms) and dotenv are imported where they are used so that importing this
+# module, or running the CLI's --help/error paths, doesn't pay for the SDK.
+if TYPE_CHECKING:  # pragma: no cover
+    import plaid
+    from plaid.api import plaid_api
 
-# Load environment variables once on import. Individual functions handle validation.
-load_dotenv()
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-ACCESS_TOKEN_PATTERN = re.compile(r"^access-(sandbox|development|production)-[A-Za-z0-9-]+$")
+# Used with fullmatch(), so no ^/$ anchors are needed.
+ACCESS_TOKEN_PATTERN = re.compile(r"access-(sandbox|development|production)-[A-Za-z0-9-]+")
+
+# Plaid's maximum page size for /transactions/get and /transactions/sync.
+TRANSACTIONS_PAGE_SIZE = 500
+RATE_LIMIT_RETRIES = 3
+# Worker threads used to fetch the remaining /transactions/get pages in parallel.
+try:
+    PLAID_FETCH_CONCURRENCY = max(1, int(os.getenv("PLAID_FETCH_CONCURRENCY") or 4))
+except ValueError:
+    logger.warning("PLAID_FETCH_CONCURRENCY is not an integer; using 4.")
+    PLAID_FETCH_CONCURRENCY = 4
+# Minimum keep-alive connections per client; sized for concurrent items x concurrent pages.
+PLAID_CONNECTION_POOL_SIZE = 16
+
+# Serialises read-modify-write cycles on the token store across worker threads.
+_TOKEN_STORE_LOCK = threading.RLock()
 
 
 class PlaidConfigurationError(RuntimeError):
@@ -42,39 +66,93 @@ class PlaidAccessTokenError(RuntimeError):
     """Raised when no valid Plaid access token is available."""
 
 
-@dataclass
+@dataclass(frozen=True)
 class PlaidCredentials:
+    # Declared by hand rather than dataclass(slots=True) to stay compatible with Python < 3.10.
+    __slots__ = ("client", "environment")
+
     client: plaid_api.PlaidApi
     environment: str
 
 
+@functools.lru_cache(maxsize=None)
+def load_environment() -> None:
+    """Load the project ``.env`` (and any in the working directory) once per process."""
+    from dotenv import load_dotenv
+
+    env_file = project_root() / ".env"
+    if env_file.exists():
+        load_dotenv(env_file)
+    load_dotenv()
+
+
+@functools.lru_cache(maxsize=None)
 def project_root() -> Path:
     """Return the repository root."""
     return Path(__file__).resolve().parents[2]
 
 
+@functools.lru_cache(maxsize=None)
 def default_token_store_path() -> Path:
     """Location used to persist exchanged access tokens."""
     return project_root() / "data" / "plaid_access_tokens.json"
 
 
+# Parsed token stores keyed by path, tagged with the (mtime_ns, size) they were read at.
+_TOKEN_STORE_CACHE: Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+
+def _stat_key(target: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = target.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 def read_token_store(path: Optional[Path] = None) -> Dict[str, Any]:
     """Load the persisted token store, ignoring format errors."""
     target = Path(path) if path else default_token_store_path()
-    if not target.exists():
+    key = _stat_key(target)
+    if key is None:
+        _TOKEN_STORE_CACHE.pop(target, None)
         return {"items": {}}
+    cached = _TOKEN_STORE_CACHE.get(target)
+    if cached is not None and cached[0] == key:
+        return copy.deepcopy(cached[1])
     try:
-        return json.loads(target.read_text())
+        data = orjson.loads(target.read_bytes()) if orjson is not None else json.loads(target.read_text())
     except Exception as exc:  # pragma: no cover - extremely unlikely
         logger.warning("Unable to read token store %s: %s", target, exc)
         return {"items": {}}
+    _TOKEN_STORE_CACHE[target] = (key, data)
+    return copy.deepcopy(data)
 
 
 def write_token_store(data: Dict[str, Any], path: Optional[Path] = None) -> None:
     """Persist the token store to disk."""
     target = Path(path) if path else default_token_store_path()
     target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_text(json.dumps(data, indent=2, sort_keys=True))
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    else:
+        payload = json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+    # Write a sibling temp file and rename it over the store so readers never see a partial file.
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(payload)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    key = _stat_key(target)
+    if key is not None:
+        _TOKEN_STORE_CACHE[target] = (key, copy.deepcopy(data))
 
 
 def store_access_token(
@@ -94,23 +172,27 @@ def store_access_token(
             "Provided access token is invalid. Expected format: access-<environment>-<identifier>"
         )
 
+    load_environment()
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat(timespec="seconds")
     resolved_item_id = (item_id or os.getenv("PLAID_ITEM_ID") or "").strip() or None
     if not resolved_item_id:
-        resolved_item_id = f"manual_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+        resolved_item_id = f"manual_{now.strftime('%Y%m%d%H%M%S')}"
 
-    store = read_token_store(token_store_path)
-    items = store.setdefault("items", {})
-    items[resolved_item_id] = token
+    with _TOKEN_STORE_LOCK:
+        store = read_token_store(token_store_path)
+        items = store.setdefault("items", {})
+        items[resolved_item_id] = token
 
-    item_metadata = store.setdefault("item_metadata", {})
-    item_metadata[resolved_item_id] = {
-        "source": source,
-        "updated_at": datetime.utcnow().isoformat(),
-    }
+        item_metadata = store.setdefault("item_metadata", {})
+        item_metadata[resolved_item_id] = {
+            "source": source,
+            "updated_at": now_iso,
+        }
 
-    store["last_updated"] = datetime.utcnow().isoformat()
-    store["last_item_id"] = resolved_item_id
-    write_token_store(store, token_store_path)
+        store["last_updated"] = now_iso
+        store["last_item_id"] = resolved_item_id
+        write_token_store(store, token_store_path)
 
     os.environ["PLAID_ACCESS_TOKEN"] = token
     os.environ["PLAID_ITEM_ID"] = resolved_item_id
@@ -126,16 +208,49 @@ def store_access_token(
 def is_valid_access_token(token: Optional[str]) -> bool:
     """Return True if the string matches Plaid access token format."""
     token = (token or "").strip()
-    return bool(token and ACCESS_TOKEN_PATTERN.match(token))
+    return bool(token and ACCESS_TOKEN_PATTERN.fullmatch(token))
 
 
-def extract_plaid_error(exc: plaid.ApiException) -> str:
-    """Extract a readable error message from Plaid ApiException."""
+def _plaid_error_payload(exc: plaid.ApiException) -> Dict[str, Any]:
+    """Decode the JSON error body of a Plaid ApiException, if any."""
     body = getattr(exc, "body", "")
     try:
         payload = json.loads(body) if body else {}
     except Exception:
         payload = {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def plaid_error_code(exc: plaid.ApiException) -> Optional[str]:
+    """Return the Plaid ``error_code`` (e.g. RATE_LIMIT_EXCEEDED) of an ApiException."""
+    return _plaid_error_payload(exc).get("error_code")
+
+
+def is_rate_limited(exc: plaid.ApiException) -> bool:
+    """Return True if Plaid rejected the call because of a rate limit."""
+    if getattr(exc, "status", None) == 429:
+        return True
+    return _plaid_error_payload(exc).get("error_type") == "RATE_LIMIT_EXCEEDED"
+
+
+def call_with_backoff(endpoint: Any, request: Any, retries: int = RATE_LIMIT_RETRIES) -> Any:
+    """Call a Plaid endpoint, retrying with exponential backoff while rate limited."""
+    import plaid
+
+    for attempt in range(retries + 1):
+        try:
+            return endpoint(request)
+        except plaid.ApiException as exc:
+            if attempt == retries or not is_rate_limited(exc):
+                raise
+            delay = 2 ** attempt
+            logger.warning("Plaid rate limit hit (%s); retrying in %ss", extract_plaid_error(exc), delay)
+            time.sleep(delay)
+
+
+def extract_plaid_error(exc: plaid.ApiException) -> str:
+    """Extract a readable error message from Plaid ApiException."""
+    payload = _plaid_error_payload(exc)
 
     code = payload.get("error_code")
     message = payload.get("error_message") or payload.get("display_message")
@@ -156,6 +271,9 @@ def extract_plaid_error(exc: plaid.ApiException) -> str:
 
 def create_plaid_client() -> PlaidCredentials:
     """Instantiate a Plaid client from environment variables."""
+    import plaid
+
+    load_environment()
     client_id = os.getenv("PLAID_CLIENT_ID")
     secret = os.getenv("PLAID_SECRET")
     env_name = (os.getenv("PLAID_ENV") or "production").strip().lower()
@@ -178,6 +296,15 @@ def create_plaid_client() -> PlaidCredentials:
             f"Unsupported PLAID_ENV '{env_name}'. Valid options: sandbox, development, production."
         )
 
+    return _get_cached_client(client_id, secret, env_name, plaid_env)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cached_client(client_id: str, secret: str, env_name: str, plaid_env: str) -> PlaidCredentials:
+    """Build one PlaidApi per credential set so its connection pool and TLS sessions are reused."""
+    import plaid
+    from plaid.api import plaid_api
+
     configuration = plaid.Configuration(
         host=plaid_env,
         api_key={
@@ -185,6 +312,8 @@ def create_plaid_client() -> PlaidCredentials:
             "secret": secret,
         },
     )
+    # plaid-python defaults to cpu_count() * 5; only ever grow it to our floor.
+    configuration.connection_pool_maxsize = max(configuration.connection_pool_maxsize, PLAID_CONNECTION_POOL_SIZE)
     api_client = plaid.ApiClient(configuration)
     return PlaidCredentials(client=plaid_api.PlaidApi(api_client), environment=env_name)
 
@@ -196,6 +325,9 @@ def exchange_public_token(
     write_to_store: bool = True,
 ) -> Tuple[str, Optional[str]]:
     """Exchange a public token and persist the resulting access token."""
+    import plaid
+    from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+
     try:
         request = ItemPublicTokenExchangeRequest(public_token=public_token)
         response = credentials.client.item_public_token_exchange(request)
@@ -235,38 +367,43 @@ def resolve_access_token(
     3. Token store on disk (persisted exchanges)
     4. Exchange PLAID_PUBLIC_TOKEN if provided
     """
-    candidates: List[Tuple[str, Optional[str], str]] = []
+    load_environment()
 
     env_token = (os.getenv("PLAID_ACCESS_TOKEN") or "").strip()
     env_item = (os.getenv("PLAID_ITEM_ID") or "").strip() or None
-    if is_valid_access_token(env_token):
-        candidates.append((env_token, env_item, "PLAID_ACCESS_TOKEN"))
-    elif env_token:
+    env_valid = is_valid_access_token(env_token)
+    if env_token and not env_valid:
         logger.warning("PLAID_ACCESS_TOKEN is set but not a valid Plaid access token format.")
+    if env_valid and (not preferred_item_id or env_item == preferred_item_id):
+        return env_token, env_item, "PLAID_ACCESS_TOKEN"
+
+    store = read_token_store(token_store_path)
+    items = store.get("items") or {}
+
+    if preferred_item_id:
+        token = items.get(preferred_item_id)
+        if token and is_valid_access_token(token):
+            return token, preferred_item_id, "token_store"
+
+    # No preferred match: take the first usable token in precedence order.
+    if env_valid:
+        return env_token, env_item, "PLAID_ACCESS_TOKEN"
 
     csv_tokens = os.getenv("PLAID_ACCESS_TOKENS")
     if csv_tokens:
+        seen = set()
         for raw in csv_tokens.split(","):
             token = raw.strip()
-            if not token:
+            if not token or token in seen:
                 continue
+            seen.add(token)
             if is_valid_access_token(token):
-                candidates.append((token, None, "PLAID_ACCESS_TOKENS"))
-            else:
-                logger.warning("Ignoring token that does not match Plaid format from PLAID_ACCESS_TOKENS.")
+                return token, None, "PLAID_ACCESS_TOKENS"
+            logger.warning("Ignoring token that does not match Plaid format from PLAID_ACCESS_TOKENS.")
 
-    store = read_token_store(token_store_path)
-    for item_id, token in (store.get("items") or {}).items():
+    for item_id, token in items.items():
         if is_valid_access_token(token):
-            candidates.append((token, item_id, "token_store"))
-
-    if preferred_item_id:
-        for token, item_id, source in candidates:
-            if item_id == preferred_item_id:
-                return token, item_id, source
-
-    if candidates:
-        return candidates[0]
+            return token, item_id, "token_store"
 
     public_token = (os.getenv("PLAID_PUBLIC_TOKEN") or "").strip()
     if public_token:
@@ -316,6 +453,7 @@ def determine_date_range(
 
 def build_account_filters() -> Dict[str, List[str]]:
     """Read optional account filtering configuration from environment variables."""
+    load_environment()
     account_ids = [x.strip() for x in (os.getenv("PLAID_ACCOUNT_IDS") or "").split(",") if x.strip()]
     account_name_keywords = [
         x.strip().lower() for x in (os.getenv("PLAID_ACCOUNT_NAME_FILTER") or "").split(",") if x.strip()
@@ -331,6 +469,33 @@ def build_account_filters() -> Dict[str, List[str]]:
     }
 
 
+_NO_ACCOUNT_FIELDS = ("", "", "")
+
+
+def _resolve_account_fields(account_map: Dict[str, Any]) -> Dict[str, Tuple[str, str, str]]:
+    """
+    Resolve each account's lookup fields once, instead of once per transaction.
+
+    Returns ``{account_id: (name_lower, subtype_lower, display_name)}``.
+    """
+    resolved: Dict[str, Tuple[str, str, str]] = {}
+    for account_id, account in account_map.items():
+        official_name = getattr(account, "official_name", None)
+        name = getattr(account, "name", None)
+        resolved[account_id] = (
+            (official_name or name or "").lower(),
+            (getattr(account, "subtype", "") or "").lower(),
+            official_name or name or getattr(account, "masked", None) or "",
+        )
+    return resolved
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_keyword_pattern(keywords: Tuple[str, ...]) -> re.Pattern:
+    """Compile account-name keywords into one alternation so each name is scanned once."""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
 def filter_transactions(
     transactions: Iterable[Any],
     account_map: Dict[str, Any],
@@ -344,23 +509,29 @@ def filter_transactions(
     if not account_ids and not name_keywords and not subtypes:
         return list(transactions)
 
-    result: List[Any] = []
-    for txn in transactions:
-        account = account_map.get(txn.account_id)
-        account_name = ""
-        account_subtype = ""
-        if account is not None:
-            account_name = (getattr(account, "official_name", None) or getattr(account, "name", "") or "").lower()
-            account_subtype = (getattr(account, "subtype", "") or "").lower()
+    keyword_search = _compile_keyword_pattern(tuple(name_keywords)).search if name_keywords else None
+    account_fields = _resolve_account_fields(account_map)
 
+    # Every criterion depends only on the account, so decide once per account_id.
+    decisions: Dict[str, bool] = {}
+
+    def keep_account(account_id: str) -> bool:
+        account_name, account_subtype, _ = account_fields.get(account_id, _NO_ACCOUNT_FIELDS)
         keep = True
         if account_ids:
-            keep = txn.account_id in account_ids
-        if keep and name_keywords:
-            keep = bool(account_name and any(keyword in account_name for keyword in name_keywords))
+            keep = account_id in account_ids
+        if keep and keyword_search is not None:
+            keep = bool(account_name and keyword_search(account_name))
         if keep and subtypes:
             keep = account_subtype in subtypes
+        return keep
 
+    result: List[Any] = []
+    for txn in transactions:
+        account_id = txn.account_id
+        keep = decisions.get(account_id)
+        if keep is None:
+            keep = decisions[account_id] = keep_account(account_id)
         if keep:
             result.append(txn)
 
@@ -375,92 +546,238 @@ def fetch_transactions_for_token(
     filters: Optional[Dict[str, List[str]]] = None,
 ) -> Tuple[List[Any], Dict[str, Any]]:
     """Retrieve Plaid transactions and accompanying accounts."""
+    import plaid
+    from plaid.model.transactions_get_request import TransactionsGetRequest
+    from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
+
     filters = filters or {}
-    options = TransactionsGetRequestOptions()
-    account_ids = filters.get("account_ids") or []
-    if account_ids:
-        options.account_ids = list(account_ids)
-
-    request = TransactionsGetRequest(
-        access_token=access_token,
-        start_date=start_date,
-        end_date=end_date,
-        options=options,
-    )
+    account_ids = list(filters.get("account_ids") or [])
+
+    def fetch_page(offset: int) -> Any:
+        # Each page gets its own request object so workers never share mutable options.
+        options = TransactionsGetRequestOptions(offset=offset, count=TRANSACTIONS_PAGE_SIZE)
+        if account_ids:
+            options.account_ids = account_ids
+        request = TransactionsGetRequest(
+            access_token=access_token,
+            start_date=start_date,
+            end_date=end_date,
+            options=options,
+        )
+        return call_with_backoff(credentials.client.transactions_get, request)
 
     try:
-        response = credentials.client.transactions_get(request)
+        response = fetch_page(0)
+        transactions = list(response.transactions)
+        accounts = {acct.account_id: acct for acct in getattr(response, "accounts", [])}
+
+        # The first page tells us the total, so the remaining offsets are known up front.
+        offsets = range(len(transactions), response.total_transactions, TRANSACTIONS_PAGE_SIZE)
+        total = response.total_transactions
+        if transactions and offsets:
+            workers = min(PLAID_FETCH_CONCURRENCY, len(offsets))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # map() yields in offset order, so the merged list keeps Plaid's ordering.
+                for offset, page in zip(offsets, executor.map(fetch_page, offsets)):
+                    rows = list(page.transactions)
+                    for acct in getattr(page, "accounts", []):
+                        accounts[acct.account_id] = acct
+                    # A short page would silently drop rows; fill its window sequentially
+                    # (stopping on an empty page) before moving on to the next offset.
+                    expected = min(TRANSACTIONS_PAGE_SIZE, total - offset)
+                    while rows and len(rows) < expected:
+                        extra = fetch_page(offset + len(rows)).transactions
+                        if not extra:
+                            break
+                        rows.extend(extra[: expected - len(rows)])
+                    transactions.extend(rows)
+
+        if len(transactions) < total:
+            logger.warning(
+                "Plaid reported %s transactions but only %s were returned", total, len(transactions)
+            )
     except plaid.ApiException as exc:
         raise RuntimeError(f"Plaid API Error: {extract_plaid_error(exc)}") from exc
 
-    transactions = list(response.transactions)
-    accounts = {acct.account_id: acct for acct in getattr(response, "accounts", [])}
-
-    while len(transactions) < response.total_transactions:
-        request.options.offset = len(transactions)
-        response = credentials.client.transactions_get(request)
-        transactions.extend(response.transactions)
-        for acct in getattr(response, "accounts", []):
-            accounts[acct.account_id] = acct
-
     transactions = filter_transactions(transactions, accounts, filters)
     return transactions, accounts
 
 
+def fetch_accounts_for_token(
+    credentials: PlaidCredentials,
+    access_token: str,
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Return ``({account_id: account}, item_id)`` for an access token via /accounts/get."""
+    import plaid
+    from plaid.model.accounts_get_request import AccountsGetRequest
+
+    try:
+        response = call_with_backoff(credentials.client.accounts_get, AccountsGetRequest(access_token=access_token))
+    except plaid.ApiException as exc:
+        raise RuntimeError(f"Plaid API Error: {extract_plaid_error(exc)}") from exc
+
+    accounts = {acct.account_id: acct for acct in response.accounts}
+    item = getattr(response, "item", None)
+    return accounts, getattr(item, "item_id", None)
+
+
+def read_sync_cursor(item_id: str, token_store_path: Optional[Path] = None) -> Optional[str]:
+    """Return the persisted /transactions/sync cursor for ``item_id``, if any."""
+    return (read_token_store(token_store_path).get("cursors") or {}).get(item_id)
+
+
+def store_sync_cursor(item_id: str, cursor: str, token_store_path: Optional[Path] = None) -> None:
+    """Persist the /transactions/sync cursor for ``item_id`` in the token store."""
+    with _TOKEN_STORE_LOCK:
+        store = read_token_store(token_store_path)
+        store.setdefault("cursors", {})[item_id] = cursor
+        write_token_store(store, token_store_path)
+
+
+def sync_transactions_for_token(
+    credentials: PlaidCredentials,
+    access_token: str,
+    cursor: Optional[str] = None,
+    count: int = TRANSACTIONS_PAGE_SIZE,
+) -> Tuple[List[Any], List[Any], List[str], str]:
+    """
+    Pull transaction changes since ``cursor`` using Plaid's /transactions/sync.
+
+    Without a cursor Plaid returns the item's full history. Returns
+    ``(added, modified, removed_transaction_ids, next_cursor)``; persist the
+    cursor (see ``store_sync_cursor``) so the next call only sees the delta.
+    """
+    import plaid
+    from plaid.model.transactions_sync_request import TransactionsSyncRequest
+
+    start_cursor = cursor
+    added: List[Any] = []
+    modified: List[Any] = []
+    removed: List[str] = []
+    restarts = 0
+    has_more = True
+
+    while has_more:
+        request_kwargs: Dict[str, Any] = {"access_token": access_token, "count": count}
+        if cursor:
+            request_kwargs["cursor"] = cursor
+        try:
+            response = call_with_backoff(credentials.client.transactions_sync, TransactionsSyncRequest(**request_kwargs))
+        except plaid.ApiException as exc:
+            if plaid_error_code(exc) == "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION":
+                # Plaid requires restarting the whole pagination from the original cursor.
+                restarts += 1
+                if restarts > RATE_LIMIT_RETRIES:
+                    raise RuntimeError(
+                        f"Transactions kept changing during sync pagination; gave up after {RATE_LIMIT_RETRIES} restarts."
+                    ) from exc
+                logger.info("Transactions changed during sync pagination; restarting from the original cursor.")
+                cursor = start_cursor
+                added, modified, removed = [], [], []
+                continue
+            raise RuntimeError(f"Plaid API Error: {extract_plaid_error(exc)}") from exc
+
+        added.extend(response.added)
+        modified.extend(response.modified)
+        removed.extend(txn.transaction_id for txn in response.removed)
+        has_more = response.has_more
+        cursor = response.next_cursor
+
+    return added, modified, removed, cursor
+
+
+_TXN_FIELDS = attrgetter("date", "name", "merchant_name", "amount", "account_id", "category", "transaction_id")
+
+
+def _txn_fields_with_defaults(txn: Any) -> Tuple[Any, ...]:
+    """Slow path for partial models where some attributes are missing."""
+    return (
+        getattr(txn, "date", ""),
+        getattr(txn, "name", ""),
+        getattr(txn, "merchant_name", None),
+        getattr(txn, "amount", 0.0),
+        getattr(txn, "account_id", ""),
+        getattr(txn, "category", []),
+        getattr(txn, "transaction_id", ""),
+    )
+
+
 def serialize_transactions(transactions: Iterable[Any], account_map: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Convert Plaid transaction models into serializable dicts."""
+    account_fields_get = _resolve_account_fields(account_map).get
+    get_fields = _TXN_FIELDS
     data: List[Dict[str, Any]] = []
+    append = data.append
     for txn in transactions:
-        account = account_map.get(txn.account_id)
-        account_name = ""
-        if account is not None:
-            account_name = (
-                getattr(account, "official_name", None)
-                or getattr(account, "name", None)
-                or getattr(account, "masked", None)
-                or ""
-            )
-
-        data.append(
+        try:
+            txn_date, name, merchant_name, amount, account_id, category, transaction_id = get_fields(txn)
+        except AttributeError:
+            txn_date, name, merchant_name, amount, account_id, category, transaction_id = _txn_fields_with_defaults(txn)
+        append(
             {
-                "date": str(getattr(txn, "date", "")),
-                "name": getattr(txn, "name", ""),
-                "merchant_name": getattr(txn, "merchant_name", None),
-                "amount": float(getattr(txn, "amount", 0.0)),
-                "account_id": getattr(txn, "account_id", ""),
-                "account_name": account_name,
-                "category": list(getattr(txn, "category", []) or []),
-                "transaction_id": getattr(txn, "transaction_id", ""),
+                "date": str(txn_date),
+                "name": name,
+                "merchant_name": merchant_name,
+                "amount": float(amount),
+                "account_id": account_id,
+                "account_name": account_fields_get(account_id, _NO_ACCOUNT_FIELDS)[2],
+                "category": list(category or []),
+                "transaction_id": transaction_id,
             }
         )
     return data
 
 
+_EXPORT_SORT_KEY = itemgetter("date", "transaction_id")
+_EXPORT_RULE = "=" * 60
+_EXPORT_LINE = "Date: %s, Name: %s, Amount: $%.2f\n"
+_EXPORT_LINE_WITH_ACCOUNT = "Date: %s, Name: %s, Amount: $%.2f, Account: %s\n"
+_EXPORT_BUFFER_SIZE = 1 << 16
+OUTPUT_FORMATS = ("txt", "ndjson")
+
+
+def _format_export_line(txn: Dict[str, Any]) -> str:
+    account_name = txn.get("account_name")
+    if account_name:
+        return _EXPORT_LINE_WITH_ACCOUNT % (txn["date"], txn["name"], txn["amount"], account_name)
+    return _EXPORT_LINE % (txn["date"], txn["name"], txn["amount"])
+
+
+def _ndjson_line(record: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
 def write_transactions_to_file(
     transactions: List[Dict[str, Any]],
     start_date: date,
     end_date: date,
     output_dir: Optional[Path] = None,
+    output_format: str = "txt",
 ) -> Path:
-    """Persist transactions to a text file and return the path."""
+    """
+    Persist transactions to a file and return the path.
+
+    ``txt`` is the human-readable report the web app parses; ``ndjson`` writes one
+    JSON object per line for machine consumers.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{output_format}'. Valid options: {', '.join(OUTPUT_FORMATS)}.")
+
     target_dir = Path(output_dir) if output_dir else project_root() / "data"
     target_dir.mkdir(parents=True, exist_ok=True)
 
-    filename = target_dir / f"transactions_{start_date}_to_{end_date}.txt"
-    with filename.open("w", encoding="utf-8") as handle:
-        header = f"Found {len(transactions)} transactions from {start_date} to {end_date}:\n"
-        header += "=" * 60 + "\n\n"
-        handle.write(header)
+    filename = target_dir / f"transactions_{start_date}_to_{end_date}.{output_format}"
+    if output_format == "ndjson":
+        with filename.open("wb", buffering=_EXPORT_BUFFER_SIZE) as handle:
+            handle.writelines(map(_ndjson_line, transactions))
+        return filename
 
-        for txn in transactions:
-            amount = txn["amount"]
-            line = f"Date: {txn['date']}, Name: {txn['name']}, Amount: ${amount:.2f}"
-            if txn.get("account_name"):
-                line += f", Account: {txn['account_name']}"
-            handle.write(line + "\n")
-
-        summary = "\n" + "=" * 60 + f"\nTotal transactions saved to: {filename}\n"
-        handle.write(summary)
+    with filename.open("w", encoding="utf-8", buffering=_EXPORT_BUFFER_SIZE) as handle:
+        handle.write(f"Found {len(transactions)} transactions from {start_date} to {end_date}:\n{_EXPORT_RULE}\n\n")
+        handle.writelines(map(_format_export_line, transactions))
+        handle.write(f"\n{_EXPORT_RULE}\nTotal transactions saved to: {filename}\n")
 
     return filename
 
@@ -472,6 +789,7 @@ def fetch_and_save_transactions(
     item_id: Optional[str] = None,
     output_dir: Optional[Path] = None,
     token_store_path: Optional[Path] = None,
+    output_format: str = "txt",
 ) -> Dict[str, Any]:
     """
     High-level helper used by the web app to fetch and cache transactions.
@@ -488,11 +806,11 @@ def fetch_and_save_transactions(
 
     transactions, accounts = fetch_transactions_for_token(credentials, access_token, start_date, end_date, filters)
     serialised = serialize_transactions(transactions, accounts)
-    serialised.sort(key=lambda record: (record["date"], record["transaction_id"]))
+    serialised.sort(key=_EXPORT_SORT_KEY)
 
-    file_path = write_transactions_to_file(serialised, start_date, end_date, output_dir)
+    file_path = write_transactions_to_file(serialised, start_date, end_date, output_dir, output_format)
 
-    total_amount = sum(txn["amount"] for txn in serialised)
+    total_amount = math.fsum(map(itemgetter("amount"), serialised))
     return {
         "file_path": str(file_path),
         "transaction_count": len(serialised),
@@ -506,6 +824,8 @@ def fetch_and_save_transactions(
 
 def cli(argv: Optional[List[str]] = None) -> int:
     """Command-line entry point."""
+    load_environment()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     parser = argparse.ArgumentParser(description="Fetch transactions from Plaid and cache them locally.")
     parser.add_argument("start_date", nargs="?", help="Start date in YYYY-MM-DD format.")
     parser.add_argument("end_date", nargs="?", help="End date in YYYY-MM-DD format.")
@@ -526,6 +846,12 @@ def cli(argv: Optional[List[str]] = None) -> int:
         type=Path,
         help="Override the location used to persist exchanged access tokens.",
     )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="txt",
+        help="Export format: human-readable txt (default) or newline-delimited JSON.",
+    )
 
     args = parser.parse_args(argv)
 
@@ -539,6 +865,7 @@ def cli(argv: Optional[List[str]] = None) -> int:
             item_id=args.item_id,
             output_dir=args.output_dir,
             token_store_path=args.token_store,
+            output_format=args.format,
         )
         logger.info(
             "Fetched %s transactions (%s to %s) -> %s",
@@ -1,40 +1,175 @@
+import csv
+import json
+import os
 import requests
-import pandas as pd
-from io import StringIO
 import logging
+import time
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# FRED CSV export URL for the MORTGAGE30US series
+FRED_CSV_URL = 'https://fred.stlouisfed.org/graph/fredgraph.csv?id=MORTGAGE30US'
+SERIES_ID = 'MORTGAGE30US'
+# The newest observations live at the end of the file; a few KB covers many weeks.
+TAIL_BYTES = 4096
+# Last observation plus the ETag/Last-Modified validators it was served with.
+CACHE_PATH = Path(
+    os.getenv('FRED_CACHE_PATH')
+    or Path(__file__).resolve().parents[2] / 'data' / 'fred_mortgage30us.json'
+)
+
+# (connect, read) timeouts for FRED requests.
+REQUEST_TIMEOUT = (3, 10)
+
+# Successful results are reused for an hour. The series only updates weekly, and a
+# miss after that costs just a conditional request that FRED usually answers with 304.
+MEMO_TTL_SECONDS = 3600
+_RESULT_MEMO = {}
+# In-memory copy of the CACHE_PATH payload, so a 304 is answered without touching disk.
+_CACHE_MEMO = {}
+
+# One keep-alive session so repeated refreshes reuse the TLS connection.
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.3)))
+
+
+def _latest_observation(lines):
+    """
+    Return (date, rate) for the last row of a FRED CSV that has a value.
+    FRED marks missing observations with '.' or an empty cell.
+    """
+    reader = csv.reader(lines)
+    header = next(reader)
+    value_col = header.index(SERIES_ID)
+
+    latest = None
+    for row in reader:
+        if len(row) <= value_col:
+            continue
+        try:
+            latest = (row[0], float(row[value_col]))
+        except ValueError:
+            continue
+    if latest is None:
+        raise ValueError(f'No {SERIES_ID} observations found in FRED response')
+    return latest
+
+
+def _latest_observation_from_tail(chunk):
+    """
+    Return (date, rate) from the trailing bytes of the CSV, or None if the
+    fragment holds no complete row with a value.
+    """
+    lines = chunk.decode('utf-8', errors='replace').splitlines()
+    # The first line of a byte-range fragment is almost certainly cut mid-row.
+    for row in csv.reader(reversed(lines[1:])):
+        if len(row) < 2:
+            continue
+        try:
+            return row[0], float(row[-1])
+        except ValueError:
+            continue
+    return None
+
+
+def _read_cache():
+    if 'payload' in _CACHE_MEMO:
+        return _CACHE_MEMO['payload']
+    try:
+        payload = json.loads(CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return None
+    _CACHE_MEMO['payload'] = payload
+    return payload
+
+
+def _write_cache(latest, headers):
+    payload = {
+        'date': latest[0],
+        'rate': latest[1],
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+    }
+    _CACHE_MEMO['payload'] = payload
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_PATH.write_text(json.dumps(payload))
+    except OSError as e:
+        logger.warning('Unable to write FRED cache %s: %s', CACHE_PATH, e)
+
+
+def _fetch_full():
+    # No per-request headers: the session's default Accept-Encoding (gzip, deflate)
+    # applies, unlike the ranged request, which has to ask for identity.
+    with _SESSION.get(FRED_CSV_URL, stream=True, timeout=REQUEST_TIMEOUT) as resp:
+        resp.raise_for_status()
+        resp.encoding = resp.encoding or 'utf-8'
+        return _latest_observation(resp.iter_lines(decode_unicode=True)), resp.headers
+
+
+def _fetch_latest(cached):
+    """
+    Return ((date, rate), response_headers). When FRED answers 304 the cached
+    observation is returned with headers of None.
+    """
+    # Ask for just the tail of the file. Identity encoding keeps the byte
+    # range meaningful (ranges over gzip bodies can't be decoded alone).
+    headers = {'Range': f'bytes=-{TAIL_BYTES}', 'Accept-Encoding': 'identity'}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    with _SESSION.get(FRED_CSV_URL, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as resp:
+        if resp.status_code == 304 and cached:
+            return (cached['date'], float(cached['rate'])), None
+        resp.raise_for_status()  # ensure we notice bad responses
+        if resp.status_code == 206:
+            latest = _latest_observation_from_tail(resp.content)
+            if latest is not None:
+                return latest, resp.headers
+        else:
+            # Range ignored: stream the full body and keep only the newest
+            # valid row instead of loading 50+ years of data into memory.
+            resp.encoding = resp.encoding or 'utf-8'
+            return _latest_observation(resp.iter_lines(decode_unicode=True)), resp.headers
+
+    return _fetch_full()
+
 
 def get_latest_30yr_mortgage_rate():
     """
     Fetch the latest 30-year mortgage rate from FRED.
     Returns a dictionary with date, rate, and any error information.
     """
+    bucket = int(time.time() // MEMO_TTL_SECONDS)
+    # Single lookup: a concurrent refresh may clear the memo between a check and a read.
+    cached = _RESULT_MEMO.get(bucket)
+    if cached is not None:
+        return dict(cached)
+
     try:
-        # FRED CSV export URL for the MORTGAGE30US series
-        csv_url = 'https://fred.stlouisfed.org/graph/fredgraph.csv?id=MORTGAGE30US'
-        
-        # Fetch the CSV data
-        resp = requests.get(csv_url)
-        resp.raise_for_status()  # ensure we notice bad responses
-        
-        # Load into pandas
-        df = pd.read_csv(StringIO(resp.text))
-        
-        # Drop any missing values and grab the last row
-        df = df.dropna(subset=['MORTGAGE30US'])
-        latest = df.iloc[-1]
-        
-        # Extract date and value
-        date = latest['observation_date']
-        rate = float(latest['MORTGAGE30US'])
-        
-        return {
+        # A conditional GET turns the usual "nothing new this week" case into
+        # a body-less 304 answered from the on-disk cache.
+        latest, response_headers = _fetch_latest(_read_cache())
+        if response_headers is not None:
+            _write_cache(latest, response_headers)
+
+        date, rate = latest
+        result = {
             'success': True,
             'date': date,
             'rate': rate,
             'error': None
         }
+        _RESULT_MEMO.clear()
+        _RESULT_MEMO[bucket] = result
+        return dict(result)
     except Exception as e:
         return {
             'success': False,
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
+from itertools import accumulate
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
+import copy
 import json
 import re
 import sys
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
 
 
 def _get_llm_generate_json():
@@ -27,21 +38,26 @@ def _get_llm_generate_json():
         return None
 
 
+# Common aliases -> canonical category
+_CATEGORY_ALIASES: Dict[str, str] = {
+    alias: canonical
+    for canonical, aliases in (
+        ("dining_out", ("dining", "restaurants", "eating out", "food_out")),
+        ("car_insurance", ("auto_insurance", "car", "car insurance", "auto")),
+        ("groceries", ("grocery", "supermarket", "food_home")),
+        ("utilities", ("utility", "power", "electric", "gas", "water", "internet", "cable")),
+    )
+    for alias in aliases
+}
+_clean_category = re.compile(r"[^a-z0-9_]+").sub
+
+
 def normalize_category(name: str) -> str:
     """
     Normalize a category label to a small canonical set.
     """
     n = (name or "").strip().lower()
-    # Common aliases
-    if n in {"dining", "restaurants", "eating out", "food_out"}:
-        return "dining_out"
-    if n in {"auto_insurance", "car", "car insurance", "auto"}:
-        return "car_insurance"
-    if n in {"grocery", "supermarket", "food_home"}:
-        return "groceries"
-    if n in {"utility", "power", "electric", "gas", "water", "internet", "cable"}:
-        return "utilities"
-    return re.sub(r"[^a-z0-9_]+", "_", n) or "other"
+    return _CATEGORY_ALIASES.get(n) or _clean_category("_", n) or "other"
 
 
 # Very lightweight merchant keyword classifier to get started
@@ -52,6 +68,19 @@ _MERCHANT_TO_CATEGORY: List[Tuple[re.Pattern, str]] = [
     (re.compile(r"\b(pseg|coned|edison|verizon|comcast|xfinity|spectrum|at\&t|att|nj\s*gas|nj\s*water)\b", re.I), "utilities"),
 ]
 
+# All keyword lists unioned into one pattern; the named group that matched is the category.
+_COMBINED_MERCHANT_PATTERN = re.compile(
+    "|".join(f"(?P<{cat}>{pat.pattern})" for pat, cat in _MERCHANT_TO_CATEGORY),
+    re.I,
+)
+_find_merchant_keywords = _COMBINED_MERCHANT_PATTERN.finditer
+# Group name -> (priority rank, canonical interned category). Lower rank wins when a
+# text mentions keywords from more than one category.
+_CATEGORY_RANK: Dict[str, Tuple[int, str]] = {
+    cat: (rank, sys.intern(cat)) for rank, (_, cat) in enumerate(_MERCHANT_TO_CATEGORY)
+}
+_OTHER = sys.intern("other")
+
 
 def classify_transaction(merchant: str, description: str = "", explicit_category: Optional[str] = None) -> str:
     """
@@ -61,10 +90,38 @@ def classify_transaction(merchant: str, description: str = "", explicit_category
     if explicit_category:
         return normalize_category(explicit_category)
     text = f"{merchant or ''} {description or ''}"
-    for pat, cat in _MERCHANT_TO_CATEGORY:
-        if pat.search(text):
-            return cat
-    return "other"
+    best_rank, best = len(_CATEGORY_RANK), _OTHER
+    for m in _find_merchant_keywords(text):
+        rank, cat = _CATEGORY_RANK[m.lastgroup]
+        if rank < best_rank:
+            best_rank, best = rank, cat
+            if rank == 0:
+                break
+    return best
+
+
+def classify_texts(texts: List[str]) -> List[str]:
+    """
+    Keyword-classify many "merchant description" texts at once.
+
+    The texts are joined with NUL separators and scanned in a single regex pass;
+    each match is mapped back to its row by bisecting the row end offsets.
+    Results match calling classify_transaction on each text.
+    """
+    if not texts:
+        return []
+    parts = [text.replace("\x00", " ") for text in texts]
+    row_ends = list(accumulate(len(part) + 1 for part in parts))
+    no_match = len(_CATEGORY_RANK)
+    ranks = [no_match] * len(parts)
+    categories = [_OTHER] * len(parts)
+    for m in _find_merchant_keywords("\x00".join(parts)):
+        row = bisect_right(row_ends, m.start())
+        rank, cat = _CATEGORY_RANK[m.lastgroup]
+        if rank < ranks[row]:
+            ranks[row] = rank
+            categories[row] = cat
+    return categories
 
 
 def monthly_spend_by_category(transactions: List[Dict[str, Any]]) -> Dict[str, float]:
@@ -72,14 +129,33 @@ def monthly_spend_by_category(transactions: List[Dict[str, Any]]) -> Dict[str, f
     Aggregate absolute monthly spending per category.
     Assumes charges are negative amounts; treats amount<0 as spend.
     """
-    totals: Dict[str, float] = {}
+    spend: List[Tuple[Any, float]] = []
+    add_spend = spend.append
+    # Merchants repeat heavily month to month, so each distinct text is classified
+    # once, and all of them together in one batch.
+    keyword_rows: Dict[str, int] = {}
     for t in transactions:
-        amt = float(t.get("amount", 0) or 0)
+        get = t.get
+        amt = get("amount")
+        if not amt:
+            continue
+        amt = float(amt)
         if amt >= 0:
             continue  # ignore income/refunds
-        cat = classify_transaction(t.get("merchant") or t.get("name", ""), t.get("description", ""), t.get("category"))
-        totals[cat] = totals.get(cat, 0.0) + abs(amt)
-    return totals
+        explicit = get("category")
+        if explicit:
+            add_spend((normalize_category(explicit), -amt))
+        else:
+            text = f"{get('merchant') or get('name') or ''} {get('description') or ''}"
+            add_spend((keyword_rows.setdefault(text, len(keyword_rows)), -amt))
+
+    keyword_categories = classify_texts(list(keyword_rows))
+    totals: Dict[str, float] = defaultdict(float)
+    for cat, amt in spend:
+        if not isinstance(cat, str):
+            cat = keyword_categories[cat]
+        totals[cat] += amt
+    return dict(totals)
 
 
 def compare_to_benchmarks_rule_of_thumb(user_spend: Dict[str, float], state: Optional[str] = None, categories: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -125,6 +201,34 @@ def compare_to_benchmarks_rule_of_thumb(user_spend: Dict[str, float], state: Opt
     }
 
 
+# LLM benchmark results keyed by (region, rounded spend items); entries expire after a day.
+_BENCHMARK_CACHE_SIZE = 128
+_BENCHMARK_CACHE_TTL_SECONDS = 24 * 60 * 60
+_benchmark_cache: "OrderedDict[Tuple[str, Tuple[Tuple[str, float], ...]], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_benchmark_cache_lock = threading.Lock()
+
+
+def _benchmark_cache_get(key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+    with _benchmark_cache_lock:
+        entry = _benchmark_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, data = entry
+        if time.monotonic() - stored_at > _BENCHMARK_CACHE_TTL_SECONDS:
+            del _benchmark_cache[key]
+            return None
+        _benchmark_cache.move_to_end(key)
+        return copy.deepcopy(data)
+
+
+def _benchmark_cache_put(key: Tuple[Any, ...], data: Dict[str, Any]) -> None:
+    with _benchmark_cache_lock:
+        _benchmark_cache[key] = (time.monotonic(), copy.deepcopy(data))
+        _benchmark_cache.move_to_end(key)
+        while len(_benchmark_cache) > _BENCHMARK_CACHE_SIZE:
+            _benchmark_cache.popitem(last=False)
+
+
 def generate_benchmark_comparison_with_llm(user_spend: Dict[str, float], state: Optional[str] = None, categories: Optional[List[str]] = None) -> Dict[str, Any]:
     """Use the local LLM to estimate typical monthly spend by region and compare to user's spending."""
     llm_generate_json = _get_llm_generate_json()
@@ -134,9 +238,26 @@ def generate_benchmark_comparison_with_llm(user_spend: Dict[str, float], state:
     region = (state or "US").strip().upper()
     cats = categories or list(user_spend.keys())
 
+    spend_by_category = {c: round(float(user_spend.get(c, 0.0)), 2) for c in cats}
+    if categories is None and not any(spend_by_category.values()):
+        # Nothing spent and no categories asked for, so nothing to compare; skip the model call.
+        return {
+            "region": region,
+            "comparisons": [],
+            "highlights": [],
+            "disclaimer": "No spending to compare for this period.",
+        }
+    # Identical inputs (e.g. dashboard refreshes) reuse the previous answer.
+    cache_key = (region, tuple(sorted(spend_by_category.items())))
+    cached = _benchmark_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     # Build prompt
-    summary_lines = [f"- {c}: ${user_spend[c]:.2f}" for c in cats]
-    user_spend_json = json.dumps({c: round(float(user_spend.get(c, 0.0)), 2) for c in cats})
+    if orjson is not None:
+        user_spend_json = orjson.dumps(spend_by_category).decode("utf-8")
+    else:
+        user_spend_json = json.dumps(spend_by_category, separators=(",", ":"), ensure_ascii=False)
 
     prompt = f"""
 You are a personal finance analyst. Compare a user's recent monthly spending to typical averages for households in the specified US state (or national if unknown).
@@ -174,11 +295,12 @@ Output strictly as JSON with this schema:
 Return ONLY JSON, no markdown, no extra text.
 """
 
-    result = llm_generate_json(prompt)
+    result = llm_generate_json(prompt, max_tokens=2048, context_tokens=4096)
     if result.get("success"):
         data = result.get("data") or {}
         # Ensure region field present
         data.setdefault("region", region)
+        _benchmark_cache_put(cache_key, data)
         return data
     # Fallback
     return compare_to_benchmarks_rule_of_thumb(user_spend, state=state, categories=categories)
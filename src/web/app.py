@@ -1,5 +1,6 @@
 import json
 import logging
+import os
 import re
 import sys
 import uuid
@@ -56,17 +57,11 @@ from src.api.bank_data_pipeline import BankDataPipeline
 
 
 
-_bank_pipeline = None
-
-
 def get_bank_pipeline():
-    """Return a cached BankDataPipeline instance."""
-    global _bank_pipeline
+    """Return the shared BankDataPipeline instance."""
     if BankDataPipeline is None:
         raise RuntimeError("Plaid pipeline utilities are unavailable. Check your installation.")
-    if _bank_pipeline is None:
-        _bank_pipeline = BankDataPipeline()
-    return _bank_pipeline
+    return BankDataPipeline.get_shared()
 
 
 def fetch_fresh_transactions_from_plaid(days_back=90):
@@ -112,6 +107,21 @@ def fetch_latest_transactions():
     except Exception as e:
         return {'success': False, 'file_path': None, 'error': str(e)}
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_TRANSACTION_LINE_RE = re.compile(r'Date: ([\d-]+), Name: ([^,]+), Amount: \$([+-]?[\d.]+)(?:, Account: ([^\n]+))?')
+
+
+def _parse_transaction_date(date_str):
+    # Exported files always use zero-padded YYYY-MM-DD, which fromisoformat parses
+    # far faster than strptime; anything else keeps the strict strptime behaviour.
+    if len(date_str) == 10:
+        try:
+            return datetime.fromisoformat(date_str)
+        except ValueError:
+            pass
+    return datetime.strptime(date_str, '%Y-%m-%d')
+
+
 def parse_transaction_file(file_path):
     """Parse transaction file into structured data"""
     transactions = []
@@ -119,22 +129,22 @@ def parse_transaction_file(file_path):
         with open(file_path, 'r') as f:
             content = f.read()
 
-        pattern = r'Date: ([\d-]+), Name: ([^,]+), Amount: \$([+-]?[\d.]+)(?:, Account: ([^\n]+))?'
-        matches = re.findall(pattern, content)
+        matches = _TRANSACTION_LINE_RE.findall(content)
 
         for i, (date_str, name, amount_str, account_name) in enumerate(matches):
             try:
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                amount = float(amount_str.strip())
+                date_obj = _parse_transaction_date(date_str)
+                amount = float(amount_str)
                 account_clean = account_name.strip() if account_name else None
+                name = name.strip()
 
                 transactions.append({
                     'id': i + 1,
                     'date': date_str,
                     'datetime': date_obj,
-                    'name': name.strip(),
-                    'merchant': name.strip(),
-                    'description': name.strip(),
+                    'name': name,
+                    'merchant': name,
+                    'description': name,
                     'amount': amount,
                     'account_name': account_clean,
                     'time': '12:00:00'
@@ -398,8 +408,7 @@ def email_signup():
         return jsonify({'error': 'Email is required'}), 400
     
     # Basic email validation
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, email):
+    if not _EMAIL_RE.match(email):
         return jsonify({'error': 'Please enter a valid email address'}), 400
     
     result = save_email_signup(email, name)
@@ -526,4 +535,5 @@ def categorize_transactions_api():
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; see docs/README.md for running under gunicorn.
+    app.run(debug=os.getenv('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
@@ -1,31 +1,18 @@
-from llms import generate_json as llm_generate_json
+from collections import ChainMap
+from io import StringIO
 
+from llms import generate_json as llm_generate_json
 
-def generate_finance_tip(transactions, openai_api_key=None, use_openai=False, model=None):
-    """Generate personalized finance tip using LLM"""
-    if not llm_generate_json:
-        return {'success': False, 'analysis': {}, 'error': 'LLM not available'}
-    
-    # Limit transactions to prevent timeout
-    max_transactions = 200
-    if len(transactions) > max_transactions:
-        transactions = transactions[:max_transactions]
-    
-    csv_data = "date,time,name,description,amount,account\n"
-    for trx in transactions:
-        csv_data += f"{trx['date']},{trx.get('time','')},{trx.get('merchant','')},{trx.get('description','')},{trx.get('amount',0)},{trx.get('account','Unknown')}\n"
-    # print(f"CSV data: {csv_data}")
 
-    prompt = f"""You are a personal finance coach. Analyze these transactions and provide ONE specific actionable tip.
+# Static instructions go in the system message so the prompt prefix is identical on
+# every call (eligible for provider-side prompt caching); only the CSV varies.
+FINANCE_TIP_SYSTEM_PROMPT = """You are a personal finance coach. Analyze these transactions and provide ONE specific actionable tip.
 You must also compare spending across months if the data spans more than one month.
 
-Transaction Data (CSV):
-{csv_data}
-
   Return ONLY valid JSON in this exact format:
 
-{{
-  "tip": {{
+{
+  "tip": {
     "title": "Specific tip title based on the data",
     "advice": "Detailed explanation citing specific transactions with dates and amounts, including month-over-month comparison when available",
     "potential_savings": "$X-$Y/year based on your analysis",
@@ -34,12 +21,12 @@ Transaction Data (CSV):
       "Step 2: Another specific action",
       "Step 3: Follow-up action"
     ]
-  }},
-  "spending_insights": {{
+  },
+  "spending_insights": {
     "frequent_merchants": ["merchant1", "merchant2", "merchant3"],
     "spending_trend": "Brief trend observation, including month-over-month comparison if applicable"
-  }}
-}}
+  }
+}
 
 Expanded Analysis Rules (including month-over-month support)
 
@@ -66,9 +53,62 @@ Expanded Analysis Rules (including month-over-month support)
     6. If no strong pattern exists, focus on the largest category or month with the biggest spending jump.
 
     7. Stay strictly grounded in the provided data—do not invent charges, categories, or memberships."""
+
+
+# Prompt CSV columns: (header, transaction key), plus defaults for missing keys
+_CSV_COLUMNS = (
+    ('date', 'date'),
+    ('time', 'time'),
+    ('name', 'merchant'),
+    ('description', 'description'),
+    ('amount', 'amount'),
+    ('account', 'account'),
+)
+_CSV_DEFAULTS = {'time': '', 'merchant': '', 'description': '', 'amount': 0, 'account': 'Unknown'}
+
+
+def generate_finance_tip(transactions, openai_api_key=None, use_openai=False, model=None):
+    """Generate personalized finance tip using LLM"""
+    if not llm_generate_json:
+        return {'success': False, 'analysis': {}, 'error': 'LLM not available'}
+    
+    # Limit transactions to prevent timeout
+    max_transactions = 200
+    if len(transactions) > max_transactions:
+        transactions = transactions[:max_transactions]
+    
+    # Leave out columns that carry nothing for this batch: parsers fill in a placeholder
+    # time when the source has none, descriptions often just repeat the merchant, and
+    # an account column of all "Unknown" is pure noise.
+    skip = set()
+    if len({trx.get('time', '') for trx in transactions}) <= 1:
+        skip.add('time')
+    if all(trx.get('description', '') in ('', trx.get('merchant', '')) for trx in transactions):
+        skip.add('description')
+    if not any(trx.get('account') for trx in transactions):
+        skip.add('account')
+    columns = [(header, key) for header, key in _CSV_COLUMNS if header not in skip]
+    row_format = ",".join("{%s}" % key for _, key in columns) + "\n"
+
+    buf = StringIO()
+    buf.write(",".join(header for header, _ in columns) + "\n")
+    buf.writelines(row_format.format_map(ChainMap(trx, _CSV_DEFAULTS)) for trx in transactions)
+    csv_data = buf.getvalue()
+    # print(f"CSV data: {csv_data}")
+
+    prompt = f"Transaction Data (CSV):\n{csv_data}"
     try:
         # print(f"Prompt: {prompt}")
-        result = llm_generate_json(prompt, model=model, openai_api_key=openai_api_key, use_openai=use_openai)
+        result = llm_generate_json(
+            prompt,
+            model=model,
+            system=FINANCE_TIP_SYSTEM_PROMPT,
+            openai_api_key=openai_api_key,
+            use_openai=use_openai,
+            # One tip object out; up to 200 CSV rows in.
+            max_tokens=2048,
+            context_tokens=8192,
+        )
         if result.get('success'):
             return {'success': True, 'analysis': result.get('data', {}), 'error': None}
         return {'success': False, 'analysis': {}, 'error': result.get('error', 'Unknown error')}
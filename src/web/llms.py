@@ -1,19 +1,65 @@
+import copy
+import hashlib
 import os
 import json
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
 
 
 # Basic Ollama configuration via environment variables
 OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
 OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'qwen3:latest')
 OLLAMA_TIMEOUT_SECONDS = int(os.getenv('OLLAMA_TIMEOUT_SECONDS', '5000'))
+# Optional global overrides for Ollama's output cap and context window (empty = per-call value)
+OLLAMA_NUM_PREDICT = int(os.getenv('OLLAMA_NUM_PREDICT') or 0) or None
+OLLAMA_NUM_CTX = int(os.getenv('OLLAMA_NUM_CTX') or 0) or None
 
 # OpenAI configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-5-mini')
 OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')
+# Retries for transient OpenAI failures (rate limits, 5xx, connection errors), with exponential backoff
+OPENAI_MAX_RETRIES = max(0, int(os.getenv('OPENAI_MAX_RETRIES', '3')))
+OPENAI_RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+# Cap on in-flight OpenAI requests per process, so bursts queue here instead of tripping rate limits
+OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', '10'))
+_openai_slots = threading.BoundedSemaphore(max(1, OPENAI_MAX_CONCURRENCY))
+
+# Shared keep-alive pool for Ollama and OpenAI calls
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=8, pool_maxsize=16))
+_SESSION.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+# generate_json(cache=True) results kept in-process, keyed by a hash of the request (0 disables)
+LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', '256'))
+# Optional directory persisting those results across restarts (<key>.json per request).
+# Off by default: cached replies quote transaction details and would otherwise land on disk.
+LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', '')
 
 # Available OpenAI models for selection
 AVAILABLE_OPENAI_MODELS = [
@@ -24,22 +70,90 @@ AVAILABLE_OPENAI_MODELS = [
 ]
 
 
+class _JsonCloseDetector:
+    """Incrementally tracks {}/[] nesting (ignoring brackets inside strings) across streamed chunks."""
+
+    __slots__ = ('depth', 'started', 'in_string', 'escaped')
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> bool:
+        """Consume ``chunk``; True once the first top-level JSON value has closed."""
+        for ch in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = self.started
+            elif ch in '{[':
+                self.depth += 1
+                self.started = True
+            elif ch in '}]' and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
 def _post_ollama_generate(payload: Dict[str, Any], timeout_seconds: Optional[int] = None) -> Tuple[bool, Dict[str, Any], Optional[str]]:
-    """Send a request to Ollama's generate endpoint."""
+    """Send a streaming request to Ollama's generate endpoint.
+
+    Tokens are accumulated as they arrive and the stream is closed as soon as the
+    top-level JSON value is complete, rather than waiting for the model to stop
+    (closing the connection also cancels the rest of the generation server-side).
+    Returns the same shape as a non-streamed reply: {"response": text, "done": bool}.
+    """
     timeout = timeout_seconds or OLLAMA_TIMEOUT_SECONDS
     try:
-        response = requests.post(
+        with _SESSION.post(
             f"{OLLAMA_BASE_URL}/api/generate",
-            json=payload,
+            data=_json_dumps({**payload, 'stream': True}),
+            headers=_JSON_HEADERS,
             timeout=timeout,
-        )
-        response.raise_for_status()
-        parsed = response.json()
-        return True, parsed, None
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            pieces = []
+            detector = _JsonCloseDetector()
+            done = False
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                if chunk.get('error'):
+                    return False, {}, str(chunk['error'])
+                text = chunk.get('response', '')
+                pieces.append(text)
+                done = bool(chunk.get('done'))
+                if done or detector.feed(text):
+                    break
+        return True, {'response': ''.join(pieces), 'done': done}, None
     except Exception as exc:  # Broad except is fine for transport layer
         return False, {}, str(exc)
 
 
+def _retry_delay(attempt: int, response: Optional[requests.Response] = None) -> float:
+    """Seconds to wait before retry ``attempt`` (0-based); honours a numeric Retry-After header.
+
+    Without one, the exponential delay is jittered so concurrent callers don't retry in lockstep.
+    """
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        try:
+            return min(float(retry_after), 60.0)
+        except (TypeError, ValueError):
+            pass
+    return min(2 ** attempt, 30) * random.uniform(0.5, 1.0)
+
+
 def _post_openai_chat(
     messages: list,
     model: str,
@@ -63,49 +177,147 @@ def _post_openai_chat(
         if response_format == 'json':
             payload['response_format'] = {'type': 'json_object'}
         
-        response = requests.post(
-            f"{base_url}/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=timeout_seconds,
-        )
-        response.raise_for_status()
-        parsed = response.json()
-        return True, parsed, None
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            retries_left = attempt < OPENAI_MAX_RETRIES
+            try:
+                # Hold a slot only for the request itself, never while backing off.
+                with _openai_slots:
+                    response = _SESSION.post(
+                        f"{base_url}/chat/completions",
+                        headers=headers,
+                        data=_json_dumps(payload),
+                        timeout=timeout_seconds,
+                    )
+            except requests.ConnectionError:
+                # Covers ConnectTimeout too. Read timeouts are not retried, so one call stays within timeout_seconds.
+                if not retries_left:
+                    raise
+                time.sleep(_retry_delay(attempt))
+                continue
+            if response.status_code in OPENAI_RETRY_STATUSES and retries_left:
+                time.sleep(_retry_delay(attempt, response))
+                continue
+            response.raise_for_status()
+            parsed = _json_loads(response.content)
+            return True, parsed, None
     except Exception as exc:
         return False, {}, str(exc)
 
 
+# Outermost {...} / [...] span in free-form model output
+_JSON_OBJECT_RE = re.compile(r"\{[\s\S]*\}")
+_JSON_ARRAY_RE = re.compile(r"\[[\s\S]*\]")
+
+
 def _extract_json_maybe(text: str) -> Optional[Any]:
     """Attempt to parse JSON from a model response. Tries direct parse, then extracts first {...} or [...] block."""
     if not text:
         return None
     # First try direct parse
     try:
-        return json.loads(text)
+        return _json_loads(text)
     except Exception:
         pass
 
     # Try to extract JSON object
-    import re
-
-    obj_match = re.search(r"\{[\s\S]*\}", text)
+    obj_match = _JSON_OBJECT_RE.search(text)
     if obj_match:
         try:
-            return json.loads(obj_match.group(0))
+            return _json_loads(obj_match.group(0))
         except Exception:
             pass
 
-    arr_match = re.search(r"\[[\s\S]*\]", text)
+    arr_match = _JSON_ARRAY_RE.search(text)
     if arr_match:
         try:
-            return json.loads(arr_match.group(0))
+            return _json_loads(arr_match.group(0))
         except Exception:
             pass
 
     return None
 
 
+_llm_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_llm_cache_lock = threading.Lock()
+
+
+def _llm_cache_key(provider: str, model: str, system: Optional[str], prompt: str, options: str = '') -> str:
+    """sha256 over everything that shapes the answer (the API key deliberately excluded)."""
+    digest = hashlib.sha256()
+    for part in (provider, model, system or '', prompt, options):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def _llm_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    with _llm_cache_lock:
+        result = _llm_cache.get(key)
+        if result is None:
+            return None
+        _llm_cache.move_to_end(key)
+        return copy.deepcopy(result)
+
+
+def _llm_cache_put(key: str, result: Dict[str, Any]) -> None:
+    if LLM_CACHE_SIZE <= 0:
+        return
+    with _llm_cache_lock:
+        _llm_cache[key] = copy.deepcopy(result)
+        _llm_cache.move_to_end(key)
+        while len(_llm_cache) > LLM_CACHE_SIZE:
+            _llm_cache.popitem(last=False)
+
+
+def _llm_disk_cache_path(key: str) -> Optional[Path]:
+    return Path(LLM_CACHE_DIR) / f"{key}.json" if LLM_CACHE_DIR else None
+
+
+def _llm_disk_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    path = _llm_disk_cache_path(key)
+    if path is None:
+        return None
+    try:
+        result = _json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    return result if isinstance(result, dict) and result.get('success') else None
+
+
+def _llm_disk_cache_put(key: str, result: Dict[str, Any]) -> None:
+    path = _llm_disk_cache_path(key)
+    if path is None:
+        return
+    tmp_name = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(_json_dumps(result))
+        os.replace(tmp_name, path)
+        tmp_name = None
+    except (OSError, TypeError, ValueError):
+        pass  # The cache is best-effort; a failed write just means a future miss.
+    finally:
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+
+def _ollama_options(max_tokens: Optional[int], context_tokens: Optional[int]) -> Dict[str, int]:
+    """Ollama generation options; a smaller num_ctx also shrinks the KV cache the server allocates."""
+    options = {}
+    num_predict = OLLAMA_NUM_PREDICT or max_tokens
+    num_ctx = OLLAMA_NUM_CTX or context_tokens
+    if num_predict:
+        options['num_predict'] = num_predict
+    if num_ctx:
+        options['num_ctx'] = num_ctx
+    return options
+
+
 def generate_json(
     prompt: str,
     model: Optional[str] = None,
@@ -113,11 +325,73 @@ def generate_json(
     timeout_seconds: Optional[int] = None,
     openai_api_key: Optional[str] = None,
     use_openai: bool = False,
+    max_tokens: Optional[int] = None,
+    context_tokens: Optional[int] = None,
+    cache: bool = False,
 ) -> Dict[str, Any]:
     """Call LLM (Ollama or OpenAI) to generate valid JSON.
 
+    With ``cache=True`` identical requests are answered from an in-process cache
+    (backed by LLM_CACHE_DIR when set); only successes are cached. Leave it off for
+    callers where asking again should produce a fresh answer.
+
+    ``max_tokens`` and ``context_tokens`` size Ollama's ``num_predict`` and ``num_ctx``
+    for the workload (OLLAMA_NUM_PREDICT / OLLAMA_NUM_CTX override them); OpenAI ignores them.
+
     Returns a dict: { success: bool, data: Any, raw_text: str, error: Optional[str] }
     """
+    if not cache:
+        return _generate_json_uncached(
+            prompt,
+            model=model,
+            system=system,
+            timeout_seconds=timeout_seconds,
+            openai_api_key=openai_api_key,
+            use_openai=use_openai,
+            max_tokens=max_tokens,
+            context_tokens=context_tokens,
+        )
+
+    if use_openai or openai_api_key or OPENAI_API_KEY:
+        cache_key = _llm_cache_key('openai', model or OPENAI_MODEL, system, prompt)
+    else:
+        options = _ollama_options(max_tokens, context_tokens)
+        cache_key = _llm_cache_key('ollama', model or OLLAMA_MODEL, system, prompt, repr(sorted(options.items())))
+    cached = _llm_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    cached = _llm_disk_cache_get(cache_key)
+    if cached is not None:
+        _llm_cache_put(cache_key, cached)
+        return cached
+
+    result = _generate_json_uncached(
+        prompt,
+        model=model,
+        system=system,
+        timeout_seconds=timeout_seconds,
+        openai_api_key=openai_api_key,
+        use_openai=use_openai,
+        max_tokens=max_tokens,
+        context_tokens=context_tokens,
+    )
+    if result.get('success'):
+        _llm_cache_put(cache_key, result)
+        _llm_disk_cache_put(cache_key, result)
+    return result
+
+
+def _generate_json_uncached(
+    prompt: str,
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    timeout_seconds: Optional[int] = None,
+    openai_api_key: Optional[str] = None,
+    use_openai: bool = False,
+    max_tokens: Optional[int] = None,
+    context_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Uncached body of generate_json."""
     # Determine if we should use OpenAI
     should_use_openai = use_openai or openai_api_key or OPENAI_API_KEY
     
@@ -163,11 +437,14 @@ def generate_json(
         payload = {
             "model": model or OLLAMA_MODEL,
             "prompt": f"{system + newlines if system else ''}{prompt}",
-            "stream": False,
+            "stream": True,
             # Ollama's `format: "json"` nudges the model to emit JSON; still validate client-side.
             "format": "json",
             "keep_alive": "15m",
         }
+        options = _ollama_options(max_tokens, context_tokens)
+        if options:
+            payload["options"] = options
 
         ok, raw, err = _post_ollama_generate(payload, timeout_seconds=timeout)
         if not ok:
@@ -181,6 +458,23 @@ def generate_json(
         return {"success": True, "data": parsed, "raw_text": raw_text, "error": None}
 
 
+CATEGORIZE_SYSTEM_PROMPT = """You are a financial transaction categorization expert. 
+Categorize each transaction into ONE of these standard categories:
+- Food & Dining (restaurants, groceries, cafes, food delivery)
+- Transportation (public transit, parking, tolls, gas, rideshare)
+- Shopping (retail, clothing, general merchandise, online shopping)
+- Entertainment (movies, games, subscriptions, hobbies)
+- Bills & Utilities (electricity, gas, water, internet, phone)
+- Healthcare (medical, pharmacy, veterinary)
+- Personal Care (salon, spa, beauty)
+- Transfer & Payments (Zelle, Venmo, peer-to-peer payments)
+- Income (salary, deposits, refunds)
+- Fees & Charges (ATM fees, bank fees, service charges)
+- Other (anything that doesn't fit above)
+
+Return ONLY valid JSON."""
+
+
 def categorize_transactions(
     transactions: list,
     model: Optional[str] = None,
@@ -216,22 +510,6 @@ def categorize_transactions(
     
     transaction_text = "\n".join(transaction_lines)
     
-    system_prompt = """You are a financial transaction categorization expert. 
-Categorize each transaction into ONE of these standard categories:
-- Food & Dining (restaurants, groceries, cafes, food delivery)
-- Transportation (public transit, parking, tolls, gas, rideshare)
-- Shopping (retail, clothing, general merchandise, online shopping)
-- Entertainment (movies, games, subscriptions, hobbies)
-- Bills & Utilities (electricity, gas, water, internet, phone)
-- Healthcare (medical, pharmacy, veterinary)
-- Personal Care (salon, spa, beauty)
-- Transfer & Payments (Zelle, Venmo, peer-to-peer payments)
-- Income (salary, deposits, refunds)
-- Fees & Charges (ATM fees, bank fees, service charges)
-- Other (anything that doesn't fit above)
-
-Return ONLY valid JSON."""
-    
     prompt = f"""Categorize each of these transactions:
 
 {transaction_text}
@@ -266,10 +544,15 @@ Rules:
     result = generate_json(
         prompt, 
         model=model, 
-        system=system_prompt, 
+        system=CATEGORIZE_SYSTEM_PROMPT,
         timeout_seconds=timeout_seconds,
         openai_api_key=openai_api_key,
-        use_openai=use_openai
+        use_openai=use_openai,
+        # Up to 100 short JSON entries out; prompt plus reply must fit the window.
+        max_tokens=4096,
+        context_tokens=8192,
+        # The same transactions should keep the same categories.
+        cache=True,
     )
     
     if not result.get('success'):
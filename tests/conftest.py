@@ -0,0 +1,11 @@
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def add_web_to_syspath(monkeypatch):
+    """Make the flat ``src/web`` modules (``app``, ``llms``...) importable."""
+    monkeypatch.syspath_prepend(str(PROJECT_ROOT / "src" / "web"))
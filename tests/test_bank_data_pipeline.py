@@ -0,0 +1,275 @@
+import json
+
+import pytest
+
+
+def _pipeline_or_skip():
+    try:
+        from src.api.bank_data_pipeline import BankDataPipeline
+    except Exception as e:
+        pytest.skip(f"Skipping: unable to import bank data pipeline: {e}")
+    # Skip __init__ so no Plaid credentials are needed for formatting helpers.
+    return BankDataPipeline.__new__(BankDataPipeline)
+
+
+SAMPLE = [
+    {
+        "date": "2024-01-01",
+        "name": "COFFEE SHOP",
+        "merchant_name": None,
+        "amount": 3.5,
+        "account_id": "acc-1",
+        "account_name": "Chase Checking",
+        "category": ["Food and Drink"],
+        "transaction_id": "t1",
+    },
+    {
+        "date": "2024-01-02",
+        "name": "GROCERY STORE",
+        "merchant_name": "Grocer",
+        "amount": 45.1,
+        "account_id": "acc-1",
+        "account_name": "",
+        "category": [],
+        "transaction_id": "t2",
+    },
+]
+
+
+def test_format_json_includes_metadata_totals():
+    pipeline = _pipeline_or_skip()
+
+    data, ext = pipeline.format_transactions_for_download(SAMPLE, format_type="json")
+    assert ext == "json"
+
+    payload = json.loads(data)
+    assert payload["metadata"]["total_transactions"] == 2
+    assert payload["metadata"]["total_amount"] == pytest.approx(48.6)
+    assert payload["transactions"] == SAMPLE
+
+
+def test_format_csv_streams_to_sink():
+    import csv
+    import io
+
+    pipeline = _pipeline_or_skip()
+
+    as_string, ext = pipeline.format_transactions_for_download(SAMPLE, format_type="csv")
+    sink = io.StringIO()
+    streamed, _ = pipeline.format_transactions_for_download(SAMPLE, format_type="csv", sink=sink)
+
+    assert ext == "csv"
+    assert streamed == ""
+    assert sink.getvalue() == as_string
+
+    rows = list(csv.DictReader(io.StringIO(as_string)))
+    assert [row["transaction_id"] for row in rows] == ["t1", "t2"]
+    assert rows[0]["name"] == "COFFEE SHOP"
+
+
+def test_format_csv_fills_missing_keys_with_empty_cells():
+    import csv
+    import io
+
+    pipeline = _pipeline_or_skip()
+    partial = [SAMPLE[0], {"date": "2024-01-03", "amount": 2.0, "transaction_id": "t3"}]
+
+    data, _ = pipeline.format_transactions_for_download(partial, format_type="csv")
+
+    rows = list(csv.DictReader(io.StringIO(data)))
+    assert [row["transaction_id"] for row in rows] == ["t1", "t3"]
+    assert rows[1]["name"] == "" and rows[1]["amount"] == "2.0"
+
+
+def test_format_txt_report_layout():
+    pipeline = _pipeline_or_skip()
+
+    data, ext = pipeline.format_transactions_for_download(SAMPLE, format_type="txt")
+    assert ext == "txt"
+
+    lines = data.split("\n")
+    assert lines[0].startswith("Bank Transactions Report - Generated ")
+    assert lines[1:] == [
+        "=" * 80,
+        "",
+        "  1. 2024-01-01 | COFFEE SHOP                    | $    3.50",
+        "     Account: Chase Checking",
+        "     Category: Food and Drink",
+        "",
+        "  2. 2024-01-02 | GROCERY STORE                  | $   45.10",
+        "",
+        "=" * 80,
+        "Total transactions: 2",
+        "Total amount: $48.60",
+    ]
+
+
+def test_aone_click_download_many_preserves_order(monkeypatch):
+    import asyncio
+
+    pipeline = _pipeline_or_skip()
+    monkeypatch.setattr(
+        pipeline,
+        "one_click_download",
+        lambda *, user_id, **kwargs: {"user_id": user_id, "format": kwargs["format_type"]},
+    )
+
+    results = asyncio.run(pipeline.aone_click_download_many(["a", "b", "c"], format_type="csv"))
+    assert results == [
+        {"user_id": "a", "format": "csv"},
+        {"user_id": "b", "format": "csv"},
+        {"user_id": "c", "format": "csv"},
+    ]
+
+
+@pytest.mark.parametrize("format_type", ["json", "csv", "txt"])
+def test_format_as_bytes_matches_text(format_type):
+    from datetime import datetime
+
+    pipeline = _pipeline_or_skip()
+    stamp = datetime(2024, 2, 1, 12, 0, 0)
+
+    text, _ = pipeline.format_transactions_for_download(SAMPLE, format_type=format_type, generated_at=stamp)
+    raw, _ = pipeline.format_transactions_for_download(
+        SAMPLE, format_type=format_type, generated_at=stamp, as_bytes=True
+    )
+
+    assert isinstance(raw, bytes)
+    assert raw.decode("utf-8") == text
+
+
+def test_get_transactions_all_items_merges_items(monkeypatch, tmp_path):
+    import src.api.bank_data_pipeline as module
+
+    pipeline = _pipeline_or_skip()
+    pipeline.credentials = object()
+    pipeline.token_store_path = tmp_path / "tokens.json"
+    pipeline.account_filters = {}
+    pipeline.token_store_path.write_text(
+        json.dumps(
+            {
+                "items": {
+                    "item-a": "access-sandbox-aaa",
+                    "item-b": "access-sandbox-bbb",
+                    "item-broken": "access-sandbox-ccc",
+                    "item-bad": "not-a-token",
+                }
+            }
+        )
+    )
+
+    def fake_fetch(credentials, access_token, start, end, filters):
+        if access_token == "access-sandbox-ccc":
+            raise KeyError("account_id")
+        if access_token == "access-sandbox-bbb":
+            return [SAMPLE[0]], {}
+        return [SAMPLE[1]], {}
+
+    monkeypatch.setattr(module, "fetch_transactions_for_token", fake_fetch)
+    monkeypatch.setattr(module, "serialize_transactions", lambda transactions, accounts: list(transactions))
+
+    summary = pipeline.get_transactions_all_items(days_back=30)
+    assert summary["item_ids"] == ["item-a", "item-b"]
+    assert list(summary["failed_items"]) == ["item-broken"]
+    assert [row["transaction_id"] for row in summary["transactions"]] == ["t1", "t2"]
+    assert summary["total_amount"] == pytest.approx(48.6)
+
+
+def test_sync_transactions_filters_accounts_and_keys_cursor_by_item(monkeypatch, tmp_path):
+    from types import SimpleNamespace
+
+    import src.api.bank_data_pipeline as module
+
+    pipeline = _pipeline_or_skip()
+    pipeline.credentials = object()
+    pipeline.token_store_path = tmp_path / "tokens.json"
+    pipeline.account_filters = {"account_subtypes": ["checking"]}
+
+    accounts = {
+        "acc-1": SimpleNamespace(account_id="acc-1", name="Chase Checking", subtype="checking"),
+        "acc-2": SimpleNamespace(account_id="acc-2", name="Sapphire", subtype="credit card"),
+    }
+    added = [
+        SimpleNamespace(transaction_id="t1", account_id="acc-1"),
+        SimpleNamespace(transaction_id="t2", account_id="acc-2"),
+    ]
+    monkeypatch.setattr(module, "resolve_access_token", lambda *a, **k: ("access-sandbox-abc", None, "env"))
+    monkeypatch.setattr(module, "fetch_accounts_for_token", lambda credentials, token: (accounts, "item-from-plaid"))
+    monkeypatch.setattr(module, "sync_transactions_for_token", lambda credentials, token, cursor: (added, [], [], "c1"))
+    serialized = {}
+
+    def fake_serialize(transactions, account_map):
+        serialized.setdefault("account_maps", []).append(account_map)
+        return [txn.transaction_id for txn in transactions]
+
+    monkeypatch.setattr(module, "serialize_transactions", fake_serialize)
+
+    result = pipeline.sync_transactions()
+
+    assert result["added"] == ["t1"]
+    assert result["item_id"] == "item-from-plaid"
+    assert all(account_map is accounts for account_map in serialized["account_maps"])
+    store = json.loads(pipeline.token_store_path.read_text())
+    assert store["cursors"] == {"item-from-plaid": "c1"}
+
+
+def test_get_transactions_holds_a_plaid_fetch_slot(monkeypatch):
+    import threading
+
+    import src.api.bank_data_pipeline as module
+
+    pipeline = _pipeline_or_skip()
+    pipeline.credentials = object()
+    pipeline.token_store_path = None
+    pipeline.account_filters = {}
+    slots = threading.BoundedSemaphore(1)
+    held = []
+
+    def fake_fetch(credentials, access_token, start, end, filters):
+        held.append(not slots.acquire(blocking=False))
+        return [], {}
+
+    monkeypatch.setattr(module, "_plaid_fetch_slots", lambda: slots)
+    monkeypatch.setattr(module, "resolve_access_token", lambda *a, **k: ("access-sandbox-abc", "item-a", "env"))
+    monkeypatch.setattr(module, "fetch_transactions_for_token", fake_fetch)
+
+    pipeline.get_transactions(days_back=7)
+
+    assert held == [True]
+
+
+@pytest.mark.parametrize("format_type", ["json", "csv"])
+def test_main_keeps_existing_output_when_download_fails(monkeypatch, tmp_path, format_type):
+    import src.api.bank_data_pipeline as module
+
+    _pipeline_or_skip()
+    output = tmp_path / f"export.{format_type}"
+    output.write_text("previous export\n", encoding="utf-8")
+
+    def fail(self, **kwargs):
+        sink = kwargs.get("sink")
+        if sink is not None:
+            sink.write("partial")
+        raise module.PlaidAccessTokenError("no token")
+
+    monkeypatch.setattr(module.BankDataPipeline, "__init__", lambda self: None)
+    monkeypatch.setattr(module.BankDataPipeline, "one_click_download", fail)
+
+    assert module.main(["--download", "--format", format_type, "--output", str(output)]) == 1
+    assert output.read_text(encoding="utf-8") == "previous export\n"
+    assert [p.name for p in tmp_path.iterdir()] == [output.name]
+
+
+def test_json_fallback_matches_orjson_output(monkeypatch):
+    import src.api.bank_data_pipeline as module
+
+    _pipeline_or_skip()
+    payload = {"metadata": {"total_transactions": 1}, "transactions": [{"name": "CAFÉ ÅRHUS", "amount": 4.25}]}
+    fast = module._dumps_json_bytes(payload)
+
+    monkeypatch.setattr(module, "orjson", None)
+    fallback = module._dumps_json_bytes(payload)
+
+    assert "CAFÉ ÅRHUS".encode("utf-8") in fallback
+    assert module._dumps_json(payload).encode("utf-8") == fallback
+    assert fallback == fast
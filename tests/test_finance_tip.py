@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture
+def finance_tip(add_web_to_syspath):
+    import finance_tip  # type: ignore
+
+    return finance_tip
+
+
+def test_finance_tip_sends_csv_rows_with_static_system_prompt(finance_tip, monkeypatch):
+    captured = {}
+
+    def fake_generate_json(prompt, **kwargs):
+        captured["prompt"] = prompt
+        captured.update(kwargs)
+        return {"success": True, "data": {"tip": {"title": "Cook more"}}}
+
+    monkeypatch.setattr(finance_tip, "llm_generate_json", fake_generate_json)
+    transactions = [
+        {"date": "2024-01-02", "time": "08:15:00", "merchant": "CAFE", "description": "latte", "amount": -4.5, "account": "Card"},
+        {"date": "2024-01-03", "merchant": "GROCER", "amount": -60.0},
+    ]
+
+    result = finance_tip.generate_finance_tip(transactions)
+
+    assert result == {"success": True, "analysis": {"tip": {"title": "Cook more"}}, "error": None}
+    assert captured["system"] is finance_tip.FINANCE_TIP_SYSTEM_PROMPT
+    assert captured["prompt"] == (
+        "Transaction Data (CSV):\n"
+        "date,time,name,description,amount,account\n"
+        "2024-01-02,08:15:00,CAFE,latte,-4.5,Card\n"
+        "2024-01-03,,GROCER,,-60.0,Unknown\n"
+    )
+
+
+def test_finance_tip_drops_columns_without_information(finance_tip, monkeypatch):
+    captured = {}
+
+    def fake_generate_json(prompt, **kwargs):
+        captured["prompt"] = prompt
+        return {"success": True, "data": {}}
+
+    monkeypatch.setattr(finance_tip, "llm_generate_json", fake_generate_json)
+    transactions = [
+        {"date": "2024-01-02", "time": "12:00:00", "merchant": "CAFE", "description": "CAFE", "amount": -4.5},
+        {"date": "2024-01-03", "time": "12:00:00", "merchant": "GROCER", "description": "GROCER", "amount": -60.0},
+    ]
+
+    finance_tip.generate_finance_tip(transactions)
+
+    assert captured["prompt"] == (
+        "Transaction Data (CSV):\n"
+        "date,name,amount\n"
+        "2024-01-02,CAFE,-4.5\n"
+        "2024-01-03,GROCER,-60.0\n"
+    )
@@ -0,0 +1,426 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+def _module_or_skip():
+    try:
+        import src.api.get_bank_trx as module
+    except Exception as e:
+        pytest.skip(f"Skipping: unable to import get_bank_trx: {e}")
+    return module
+
+
+def test_sync_cursor_round_trips_through_token_store(tmp_path):
+    module = _module_or_skip()
+    store_path = tmp_path / "tokens.json"
+
+    assert module.read_sync_cursor("item-1", store_path) is None
+    module.store_sync_cursor("item-1", "cursor-abc", store_path)
+
+    assert module.read_sync_cursor("item-1", store_path) == "cursor-abc"
+    assert json.loads(store_path.read_text())["cursors"] == {"item-1": "cursor-abc"}
+
+
+def test_sync_transactions_follows_has_more():
+    module = _module_or_skip()
+
+    pages = [
+        SimpleNamespace(
+            added=["t1", "t2"], modified=[], removed=[], has_more=True, next_cursor="c1"
+        ),
+        SimpleNamespace(
+            added=["t3"],
+            modified=["t1"],
+            removed=[SimpleNamespace(transaction_id="t0")],
+            has_more=False,
+            next_cursor="c2",
+        ),
+    ]
+    seen_cursors = []
+
+    def transactions_sync(request):
+        seen_cursors.append(request.get("cursor"))
+        return pages.pop(0)
+
+    credentials = SimpleNamespace(client=SimpleNamespace(transactions_sync=transactions_sync))
+    added, modified, removed, cursor = module.sync_transactions_for_token(credentials, "access-sandbox-abc")
+
+    assert added == ["t1", "t2", "t3"]
+    assert modified == ["t1"]
+    assert removed == ["t0"]
+    assert cursor == "c2"
+    assert seen_cursors == [None, "c1"]
+
+
+def test_sync_transactions_gives_up_on_repeated_mutation(monkeypatch):
+    module = _module_or_skip()
+    import plaid
+
+    calls = []
+
+    def transactions_sync(request):
+        calls.append(request.get("cursor"))
+        exc = plaid.ApiException(status=400)
+        exc.body = json.dumps(
+            {"error_type": "TRANSACTIONS_ERROR", "error_code": "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION"}
+        )
+        raise exc
+
+    credentials = SimpleNamespace(client=SimpleNamespace(transactions_sync=transactions_sync))
+    with pytest.raises(RuntimeError, match="restarts"):
+        module.sync_transactions_for_token(credentials, "access-sandbox-abc", cursor="c0")
+
+    assert calls == ["c0"] * (module.RATE_LIMIT_RETRIES + 1)
+
+
+def test_call_with_backoff_retries_rate_limits(monkeypatch):
+    module = _module_or_skip()
+    import plaid
+
+    monkeypatch.setattr(module.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def endpoint(request):
+        calls.append(request)
+        if len(calls) < 3:
+            exc = plaid.ApiException(status=429)
+            exc.body = json.dumps({"error_type": "RATE_LIMIT_EXCEEDED", "error_code": "TRANSACTIONS_LIMIT"})
+            raise exc
+        return "ok"
+
+    assert module.call_with_backoff(endpoint, "req") == "ok"
+    assert len(calls) == 3
+
+
+def test_call_with_backoff_does_not_retry_other_errors(monkeypatch):
+    module = _module_or_skip()
+    import plaid
+
+    monkeypatch.setattr(module.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def endpoint(request):
+        calls.append(request)
+        exc = plaid.ApiException(status=400)
+        exc.body = json.dumps({"error_type": "INVALID_INPUT", "error_code": "INVALID_ACCESS_TOKEN"})
+        raise exc
+
+    with pytest.raises(plaid.ApiException):
+        module.call_with_backoff(endpoint, "req")
+    assert len(calls) == 1
+
+
+def test_fetch_transactions_for_token_fetches_remaining_pages(monkeypatch):
+    module = _module_or_skip()
+    from datetime import date
+
+    monkeypatch.setattr(module, "TRANSACTIONS_PAGE_SIZE", 2)
+    rows = [SimpleNamespace(transaction_id=f"t{i}", account_id="a1", name=f"row {i}") for i in range(5)]
+    seen_offsets = []
+
+    def transactions_get(request):
+        offset = request.options.offset
+        seen_offsets.append(offset)
+        page = rows[offset : offset + request.options.count]
+        return SimpleNamespace(
+            transactions=page,
+            accounts=[SimpleNamespace(account_id="a1")],
+            total_transactions=len(rows),
+        )
+
+    credentials = SimpleNamespace(client=SimpleNamespace(transactions_get=transactions_get))
+    transactions, accounts = module.fetch_transactions_for_token(
+        credentials, "access-sandbox-abc", date(2024, 1, 1), date(2024, 1, 31)
+    )
+
+    assert [txn.transaction_id for txn in transactions] == ["t0", "t1", "t2", "t3", "t4"]
+    assert sorted(seen_offsets) == [0, 2, 4]
+    assert list(accounts) == ["a1"]
+
+
+def test_fetch_transactions_for_token_refills_short_concurrent_pages(monkeypatch):
+    module = _module_or_skip()
+    from datetime import date
+
+    monkeypatch.setattr(module, "TRANSACTIONS_PAGE_SIZE", 2)
+    rows = [SimpleNamespace(transaction_id=f"t{i}", account_id="a1", name=f"row {i}") for i in range(6)]
+    seen_offsets = []
+
+    def transactions_get(request):
+        offset = request.options.offset
+        seen_offsets.append(offset)
+        count = request.options.count
+        if offset == 2 and seen_offsets.count(2) == 1:
+            count = 1  # the concurrent fetch of page two comes back short once
+        return SimpleNamespace(
+            transactions=rows[offset : offset + count],
+            accounts=[SimpleNamespace(account_id="a1")],
+            total_transactions=len(rows),
+        )
+
+    credentials = SimpleNamespace(client=SimpleNamespace(transactions_get=transactions_get))
+    transactions, _ = module.fetch_transactions_for_token(
+        credentials, "access-sandbox-abc", date(2024, 1, 1), date(2024, 1, 31)
+    )
+
+    assert [txn.transaction_id for txn in transactions] == ["t0", "t1", "t2", "t3", "t4", "t5"]
+    assert sorted(seen_offsets) == [0, 2, 3, 4]
+
+
+def test_create_plaid_client_reuses_client_for_same_credentials(monkeypatch):
+    module = _module_or_skip()
+
+    monkeypatch.setenv("PLAID_CLIENT_ID", "client")
+    monkeypatch.setenv("PLAID_SECRET", "secret")
+    monkeypatch.setenv("PLAID_ENV", "sandbox")
+    module._get_cached_client.cache_clear()
+
+    first = module.create_plaid_client()
+    assert module.create_plaid_client() is first
+
+    monkeypatch.setenv("PLAID_SECRET", "rotated")
+    assert module.create_plaid_client() is not first
+    module._get_cached_client.cache_clear()
+
+
+def test_read_token_store_caches_until_file_changes(tmp_path, monkeypatch):
+    module = _module_or_skip()
+    store_path = tmp_path / "tokens.json"
+    module.write_token_store({"items": {"item-1": {"access_token": "access-sandbox-a"}}}, store_path)
+
+    reads = []
+    path_cls = type(store_path)
+    for reader in ("read_text", "read_bytes"):
+        real = getattr(path_cls, reader)
+        monkeypatch.setattr(path_cls, reader, lambda self, *a, _real=real, **kw: reads.append(self) or _real(self, *a, **kw))
+
+    first = module.read_token_store(store_path)
+    first["items"].clear()  # callers may mutate their copy freely
+    assert module.read_token_store(store_path)["items"] == {"item-1": {"access_token": "access-sandbox-a"}}
+    assert reads == []
+
+    store_path.write_text(json.dumps({"items": {}, "extra": True}))
+    assert module.read_token_store(store_path) == {"items": {}, "extra": True}
+    assert len(reads) == 1
+
+
+def test_write_transactions_to_file_layout(tmp_path):
+    module = _module_or_skip()
+    from datetime import date
+
+    records = [
+        {"date": "2024-01-02", "name": "COFFEE", "amount": 3.5, "account_name": "Checking"},
+        {"date": "2024-01-03", "name": "GROCERY", "amount": 45.1, "account_name": ""},
+    ]
+    path = module.write_transactions_to_file(records, date(2024, 1, 1), date(2024, 1, 31), tmp_path)
+
+    rule = "=" * 60
+    assert path.read_text(encoding="utf-8") == (
+        f"Found 2 transactions from 2024-01-01 to 2024-01-31:\n{rule}\n\n"
+        "Date: 2024-01-02, Name: COFFEE, Amount: $3.50, Account: Checking\n"
+        "Date: 2024-01-03, Name: GROCERY, Amount: $45.10\n"
+        f"\n{rule}\nTotal transactions saved to: {path}\n"
+    )
+
+
+def test_filter_and_serialize_share_resolved_account_fields():
+    module = _module_or_skip()
+
+    accounts = {
+        "a1": SimpleNamespace(official_name=None, name="Everyday Checking", subtype="checking", masked="1234"),
+        "a2": SimpleNamespace(official_name=None, name=None, subtype="savings", masked="9876"),
+    }
+    transactions = [
+        SimpleNamespace(date="2024-01-02", name="COFFEE", amount=3.5, account_id="a1", transaction_id="t1"),
+        SimpleNamespace(date="2024-01-03", name="RENT", amount=900, account_id="a2", transaction_id="t2"),
+        SimpleNamespace(date="2024-01-04", name="ORPHAN", amount=1, account_id="zz", transaction_id="t3"),
+    ]
+
+    kept = module.filter_transactions(transactions, accounts, {"account_name_keywords": ["checking"]})
+    assert [txn.transaction_id for txn in kept] == ["t1"]
+
+    records = module.serialize_transactions(transactions, accounts)
+    assert [record["account_name"] for record in records] == ["Everyday Checking", "9876", ""]
+
+
+def test_filter_transactions_keyword_pattern_escapes_and_combines_filters():
+    module = _module_or_skip()
+
+    accounts = {
+        "a1": SimpleNamespace(official_name="Joint (Checking)", name=None, subtype="checking"),
+        "a2": SimpleNamespace(official_name="Travel Card", name=None, subtype="credit card"),
+        "a3": SimpleNamespace(official_name="Joint Savings", name=None, subtype="savings"),
+    }
+    transactions = [SimpleNamespace(account_id=acct, transaction_id=f"t{i}") for i, acct in enumerate(["a1", "a2", "a3", "a1"])]
+
+    kept = module.filter_transactions(transactions, accounts, {"account_name_keywords": ["(checking)", "travel"]})
+    assert [txn.transaction_id for txn in kept] == ["t0", "t1", "t3"]
+
+    kept = module.filter_transactions(
+        transactions, accounts, {"account_name_keywords": ["joint"], "account_subtypes": ["savings"]}
+    )
+    assert [txn.transaction_id for txn in kept] == ["t2"]
+
+
+def test_resolve_access_token_rechecks_store_entries(tmp_path, monkeypatch):
+    module = _module_or_skip()
+    store_path = tmp_path / "tokens.json"
+    for name in ("PLAID_ACCESS_TOKEN", "PLAID_ACCESS_TOKENS", "PLAID_ITEM_ID", "PLAID_PUBLIC_TOKEN"):
+        monkeypatch.delenv(name, raising=False)
+
+    module.store_access_token("access-sandbox-stored", item_id="item-1", token_store_path=store_path)
+    monkeypatch.delenv("PLAID_ACCESS_TOKEN")
+    monkeypatch.delenv("PLAID_ITEM_ID")
+
+    checked = []
+    real_check = module.is_valid_access_token
+    monkeypatch.setattr(module, "is_valid_access_token", lambda token: checked.append(token) or real_check(token))
+    monkeypatch.setenv("PLAID_ACCESS_TOKENS", "not-a-token, not-a-token,access-sandbox-a,access-sandbox-b")
+
+    token, item_id, source = module.resolve_access_token(None, preferred_item_id="item-1", token_store_path=store_path)
+
+    # The preferred item short-circuits before the CSV tokens are even looked at.
+    assert (token, item_id, source) == ("access-sandbox-stored", "item-1", "token_store")
+    assert checked == ["", "access-sandbox-stored"]
+
+    checked.clear()
+    token, item_id, source = module.resolve_access_token(None, preferred_item_id="missing", token_store_path=store_path)
+
+    # Without a match, the first valid CSV token wins and duplicates are checked once.
+    assert (token, item_id, source) == ("access-sandbox-a", None, "PLAID_ACCESS_TOKENS")
+    assert checked == ["", "not-a-token", "access-sandbox-a"]
+
+    # A hand-edited or corrupted store entry is never handed out, even for its own item.
+    store = module.read_token_store(store_path)
+    store["items"]["item-1"] = "corrupted"
+    module.write_token_store(store, store_path)
+    token, item_id, source = module.resolve_access_token(None, preferred_item_id="item-1", token_store_path=store_path)
+    assert (token, item_id, source) == ("access-sandbox-a", None, "PLAID_ACCESS_TOKENS")
+
+
+def test_resolve_access_token_prefers_env_token_for_matching_item(tmp_path, monkeypatch):
+    module = _module_or_skip()
+    store_path = tmp_path / "tokens.json"
+    module.write_token_store({"items": {"item-1": "access-sandbox-stored"}}, store_path)
+    monkeypatch.delenv("PLAID_ACCESS_TOKENS", raising=False)
+    monkeypatch.setenv("PLAID_ACCESS_TOKEN", "access-sandbox-env")
+    monkeypatch.setenv("PLAID_ITEM_ID", "item-1")
+
+    assert module.resolve_access_token(None, preferred_item_id="item-1", token_store_path=store_path) == (
+        "access-sandbox-env",
+        "item-1",
+        "PLAID_ACCESS_TOKEN",
+    )
+
+    monkeypatch.setenv("PLAID_ITEM_ID", "item-2")
+    assert module.resolve_access_token(None, preferred_item_id="item-1", token_store_path=store_path) == (
+        "access-sandbox-stored",
+        "item-1",
+        "token_store",
+    )
+
+
+def test_write_transactions_to_file_ndjson(tmp_path):
+    module = _module_or_skip()
+    from datetime import date
+
+    records = [
+        {"date": "2024-01-02", "name": "COFFEE", "amount": 3.5, "category": ["Food"]},
+        {"date": "2024-01-03", "name": "GROCERY", "amount": 45.1, "category": []},
+    ]
+    path = module.write_transactions_to_file(records, date(2024, 1, 1), date(2024, 1, 31), tmp_path, "ndjson")
+
+    assert path.name == "transactions_2024-01-01_to_2024-01-31.ndjson"
+    assert [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()] == records
+
+    with pytest.raises(ValueError):
+        module.write_transactions_to_file(records, date(2024, 1, 1), date(2024, 1, 31), tmp_path, "parquet")
+
+
+def test_serialize_transactions_handles_partial_models():
+    module = _module_or_skip()
+
+    full = SimpleNamespace(
+        date="2024-01-02",
+        name="COFFEE",
+        merchant_name="Cafe",
+        amount=3,
+        account_id="a1",
+        category=None,
+        transaction_id="t1",
+    )
+    partial = SimpleNamespace(transaction_id="t2", account_id="a1", amount=1.25)
+    accounts = {"a1": SimpleNamespace(official_name="Checking", name=None, subtype="checking")}
+
+    records = module.serialize_transactions([full, partial], accounts)
+
+    assert records[0] == {
+        "date": "2024-01-02",
+        "name": "COFFEE",
+        "merchant_name": "Cafe",
+        "amount": 3.0,
+        "account_id": "a1",
+        "account_name": "Checking",
+        "category": [],
+        "transaction_id": "t1",
+    }
+    assert records[1]["name"] == "" and records[1]["merchant_name"] is None and records[1]["amount"] == 1.25
+
+
+def test_write_token_store_replaces_atomically(tmp_path, monkeypatch):
+    module = _module_or_skip()
+    store_path = tmp_path / "tokens.json"
+    module.write_token_store({"items": {"item-1": "access-sandbox-a"}}, store_path)
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(module.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        module.write_token_store({"items": {}}, store_path)
+
+    assert json.loads(store_path.read_text()) == {"items": {"item-1": "access-sandbox-a"}}
+    assert [p.name for p in tmp_path.iterdir()] == ["tokens.json"]
+
+
+def test_write_token_store_fallback_matches_orjson(tmp_path, monkeypatch):
+    module = _module_or_skip()
+    data = {"items": {"item-1": "access-sandbox-abc"}, "item_metadata": {"item-1": {"source": "Crédit Agricole"}}}
+
+    module.write_token_store(data, tmp_path / "fast.json")
+    monkeypatch.setattr(module, "orjson", None)
+    module.write_token_store(data, tmp_path / "fallback.json")
+
+    fallback = (tmp_path / "fallback.json").read_bytes()
+    assert "Crédit Agricole".encode("utf-8") in fallback
+    assert fallback == (tmp_path / "fast.json").read_bytes()
+
+
+def test_import_does_not_load_plaid_sdk():
+    _module_or_skip()
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = "import sys; import src.api.get_bank_trx; print('plaid' in sys.modules, 'dotenv' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False False"
+
+
+def test_cached_client_never_shrinks_plaid_connection_pool():
+    module = _module_or_skip()
+    plaid = pytest.importorskip("plaid")
+
+    default_size = plaid.Configuration().connection_pool_maxsize
+    credentials = module._get_cached_client("pool-client", "pool-secret", "sandbox", "https://sandbox.plaid.com")
+
+    pool_size = credentials.client.api_client.configuration.connection_pool_maxsize
+    assert pool_size == max(default_size, module.PLAID_CONNECTION_POOL_SIZE)
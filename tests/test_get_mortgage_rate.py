@@ -0,0 +1,168 @@
+import pytest
+
+
+def _module_or_skip():
+    try:
+        import src.api.get_mortgage_rate as module
+    except Exception as e:
+        pytest.skip(f"Skipping: unable to import get_mortgage_rate: {e}")
+    return module
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    module = _module_or_skip()
+    monkeypatch.setattr(module, "CACHE_PATH", tmp_path / "fred.json")
+    monkeypatch.setattr(module, "_RESULT_MEMO", {})
+    monkeypatch.setattr(module, "_CACHE_MEMO", {})
+    return tmp_path / "fred.json"
+
+
+class _FakeResponse:
+    def __init__(self, body, status_code=200, headers=None):
+        self._body = body
+        self.status_code = status_code
+        self.encoding = None
+        self.content = body.encode("utf-8")
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self._body.splitlines():
+            yield line if decode_unicode and self.encoding else line.encode("utf-8")
+
+
+CSV_BODY = "observation_date,MORTGAGE30US\n2024-01-04,6.62\n2024-01-11,6.66\n2024-01-18,.\n2024-01-25,\n"
+
+
+def test_latest_rate_skips_missing_observations(monkeypatch):
+    module = _module_or_skip()
+    monkeypatch.setattr(module._SESSION, "get", lambda url, **kwargs: _FakeResponse(CSV_BODY))
+
+    result = module.get_latest_30yr_mortgage_rate()
+
+    assert result == {"success": True, "date": "2024-01-11", "rate": 6.66, "error": None}
+
+
+def test_latest_rate_reports_http_errors(monkeypatch):
+    module = _module_or_skip()
+    monkeypatch.setattr(module._SESSION, "get", lambda url, **kwargs: _FakeResponse("", status_code=503))
+
+    result = module.get_latest_30yr_mortgage_rate()
+
+    assert result["success"] is False
+    assert result["rate"] is None
+    assert "503" in result["error"]
+
+
+def test_latest_rate_uses_range_tail_when_supported(monkeypatch):
+    module = _module_or_skip()
+    calls = []
+    # A 206 fragment starts mid-row; the partial first line must be ignored.
+    tail = "4,6.60\n2024-01-04,6.62\n2024-01-11,6.66\n2024-01-18,.\n"
+
+    def fake_get(url, headers=None, **kwargs):
+        calls.append(headers)
+        return _FakeResponse(tail, status_code=206)
+
+    monkeypatch.setattr(module._SESSION, "get", fake_get)
+
+    result = module.get_latest_30yr_mortgage_rate()
+
+    assert result == {"success": True, "date": "2024-01-11", "rate": 6.66, "error": None}
+    assert len(calls) == 1 and calls[0]["Range"].startswith("bytes=-")
+
+
+def test_latest_rate_falls_back_to_full_download_for_empty_tail(monkeypatch):
+    module = _module_or_skip()
+    responses = [_FakeResponse("tail-only-garbage\n2024-01-18,.\n", status_code=206), _FakeResponse(CSV_BODY)]
+    sent_headers = []
+
+    def fake_get(url, headers=None, **kwargs):
+        sent_headers.append(headers or {})
+        return responses.pop(0)
+
+    monkeypatch.setattr(module._SESSION, "get", fake_get)
+
+    result = module.get_latest_30yr_mortgage_rate()
+
+    assert result["rate"] == 6.66
+    assert responses == []
+    assert sent_headers[0]["Accept-Encoding"] == "identity"
+    assert "Accept-Encoding" not in sent_headers[1]  # session default (gzip, deflate) applies
+
+
+def test_latest_rate_revalidates_with_etag_and_memoises_per_hour(monkeypatch, isolated_cache):
+    module = _module_or_skip()
+    sent_headers = []
+    responses = [
+        _FakeResponse(CSV_BODY, headers={"ETag": '"v1"', "Last-Modified": "Thu, 11 Jan 2024 00:00:00 GMT"}),
+        _FakeResponse("", status_code=304),
+    ]
+
+    def fake_get(url, headers=None, **kwargs):
+        sent_headers.append(headers or {})
+        return responses.pop(0)
+
+    monkeypatch.setattr(module._SESSION, "get", fake_get)
+
+    first = module.get_latest_30yr_mortgage_rate()
+    assert first["rate"] == 6.66
+    assert module.get_latest_30yr_mortgage_rate() == first  # same-hour call served in-process
+    assert len(sent_headers) == 1
+
+    module._RESULT_MEMO.clear()
+    second = module.get_latest_30yr_mortgage_rate()
+
+    assert second == first
+    assert sent_headers[1]["If-None-Match"] == '"v1"'
+    assert sent_headers[1]["If-Modified-Since"] == "Thu, 11 Jan 2024 00:00:00 GMT"
+
+
+def test_latest_rate_answers_304_from_memory(monkeypatch, isolated_cache):
+    module = _module_or_skip()
+    responses = [
+        _FakeResponse(CSV_BODY, headers={"ETag": '"v1"'}),
+        _FakeResponse("", status_code=304),
+    ]
+    monkeypatch.setattr(module._SESSION, "get", lambda url, **kwargs: responses.pop(0))
+
+    assert module.get_latest_30yr_mortgage_rate()["rate"] == 6.66
+    isolated_cache.unlink()
+    module._RESULT_MEMO.clear()  # as if the hour rolled over
+
+    result = module.get_latest_30yr_mortgage_rate()
+
+    assert (result["success"], result["date"], result["rate"]) == (True, "2024-01-11", 6.66)
+    assert responses == []
+
+
+def test_latest_rate_memo_expires_each_hour(monkeypatch):
+    module = _module_or_skip()
+    now = [7200.0]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return _FakeResponse(CSV_BODY)
+
+    monkeypatch.setattr(module._SESSION, "get", fake_get)
+
+    module.get_latest_30yr_mortgage_rate()
+    now[0] += 3599
+    module.get_latest_30yr_mortgage_rate()
+    assert len(calls) == 1
+
+    now[0] += 1
+    module.get_latest_30yr_mortgage_rate()
+    assert len(calls) == 2
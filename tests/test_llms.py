@@ -0,0 +1,258 @@
+import json
+
+import pytest
+import requests
+
+
+@pytest.fixture
+def llms(add_web_to_syspath, monkeypatch):
+    import llms  # type: ignore
+
+    sleeps = []
+    monkeypatch.setattr(llms.time, "sleep", sleeps.append)
+    monkeypatch.setattr(llms.random, "uniform", lambda low, high: high)
+    llms._test_sleeps = sleeps
+    return llms
+
+
+class _FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.headers = headers or {}
+        self.content = json.dumps(self._payload).encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+def _queue_post(monkeypatch, llms, outcomes):
+    calls = []
+
+    def fake_post(*args, **kwargs):
+        calls.append(kwargs)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(llms._SESSION, "post", fake_post)
+    return calls
+
+
+def test_openai_chat_retries_rate_limit_honouring_retry_after(llms, monkeypatch):
+    calls = _queue_post(monkeypatch, llms, [
+        _FakeResponse(429, headers={"Retry-After": "7"}),
+        requests.ConnectTimeout("connect timed out"),
+        _FakeResponse(200, {"choices": []}),
+    ])
+
+    ok, parsed, err = llms._post_openai_chat([], "gpt-4o", "key", "https://example.test")
+
+    assert (ok, parsed, err) == (True, {"choices": []}, None)
+    assert len(calls) == 3
+    assert llms._test_sleeps == [7.0, 2]
+
+
+def test_openai_chat_gives_up_after_max_retries(llms, monkeypatch):
+    monkeypatch.setattr(llms, "OPENAI_MAX_RETRIES", 2)
+    calls = _queue_post(monkeypatch, llms, [_FakeResponse(503)] * 3)
+
+    ok, parsed, err = llms._post_openai_chat([], "gpt-4o", "key", "https://example.test")
+
+    assert ok is False and parsed == {}
+    assert "503" in err
+    assert len(calls) == 3
+    assert llms._test_sleeps == [1, 2]
+
+
+def test_openai_chat_does_not_retry_read_timeouts(llms, monkeypatch):
+    calls = _queue_post(monkeypatch, llms, [requests.ReadTimeout("read timed out")])
+
+    ok, _, err = llms._post_openai_chat([], "gpt-4o", "key", "https://example.test")
+
+    assert ok is False and "read timed out" in err
+    assert len(calls) == 1
+    assert llms._test_sleeps == []
+
+
+def test_openai_chat_does_not_retry_client_errors(llms, monkeypatch):
+    calls = _queue_post(monkeypatch, llms, [_FakeResponse(401)])
+
+    ok, _, err = llms._post_openai_chat([], "gpt-4o", "key", "https://example.test")
+
+    assert ok is False and "401" in err
+    assert len(calls) == 1
+    assert llms._test_sleeps == []
+
+
+def test_openai_chat_bounds_concurrent_requests(llms, monkeypatch):
+    import threading
+
+    monkeypatch.setattr(llms, "_openai_slots", threading.BoundedSemaphore(2))
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+    release = threading.Event()
+
+    def fake_post(*args, **kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        release.wait(1)
+        with lock:
+            state["active"] -= 1
+        return _FakeResponse(200, {"choices": []})
+
+    monkeypatch.setattr(llms._SESSION, "post", fake_post)
+    threads = [
+        threading.Thread(target=llms._post_openai_chat, args=([], "gpt-4o", "key"))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    # Give every thread a chance to reach the semaphore before letting any finish.
+    for _ in range(100):
+        if state["active"] == 2:
+            break
+        release.wait(0.01)
+    release.wait(0.05)
+    assert state["active"] == 2
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert state["peak"] <= 2
+
+
+def test_generate_json_caches_successes_by_content(llms, monkeypatch):
+    monkeypatch.setattr(llms, "OPENAI_API_KEY", "")
+    monkeypatch.setattr(llms, "_llm_cache", llms.OrderedDict())
+    outcomes = [
+        (False, {}, "connection refused"),
+        (True, {"response": '{"a": 1}'}, None),
+    ]
+    calls = []
+
+    def fake_generate(payload, timeout_seconds=None):
+        calls.append(payload)
+        return outcomes.pop(0)
+
+    monkeypatch.setattr(llms, "_post_ollama_generate", fake_generate)
+
+    assert llms.generate_json("prompt", cache=True)["success"] is False
+    first = llms.generate_json("prompt", cache=True)
+    first["data"]["a"] = 99  # callers mutating results must not poison the cache
+    second = llms.generate_json("prompt", cache=True)
+
+    assert second["success"] is True and second["data"] == {"a": 1}
+    assert len(calls) == 2
+
+
+class _FakeStream:
+    def __init__(self, chunks):
+        self._lines = [json.dumps(chunk).encode() for chunk in chunks]
+        self.consumed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        for line in self._lines:
+            self.consumed += 1
+            yield line
+
+
+def test_ollama_stream_stops_once_json_closes(llms, monkeypatch):
+    stream = _FakeStream([
+        {"response": '{"note": "braces } in', "done": False},
+        {"response": ' a string", "items": [1, 2]', "done": False},
+        {"response": "}", "done": False},
+        {"response": "\n\ntrailing chatter", "done": False},
+        {"response": "", "done": True},
+    ])
+    sent = {}
+
+    def fake_post(url, data=None, **kwargs):
+        sent.update(json.loads(data))
+        return stream
+
+    monkeypatch.setattr(llms._SESSION, "post", fake_post)
+
+    ok, raw, err = llms._post_ollama_generate({"model": "m", "prompt": "p"})
+
+    assert ok is True and err is None
+    assert sent["stream"] is True
+    assert stream.consumed == 3
+    assert llms._extract_json_maybe(raw["response"]) == {"note": "braces } in a string", "items": [1, 2]}
+
+
+def test_ollama_stream_surfaces_server_errors(llms, monkeypatch):
+    stream = _FakeStream([{"error": "model not found"}])
+    monkeypatch.setattr(llms._SESSION, "post", lambda *a, **k: stream)
+
+    assert llms._post_ollama_generate({"model": "m", "prompt": "p"}) == (False, {}, "model not found")
+
+
+def test_generate_json_persists_results_in_cache_dir(llms, monkeypatch, tmp_path):
+    monkeypatch.setattr(llms, "OPENAI_API_KEY", "")
+    monkeypatch.setattr(llms, "LLM_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(llms, "_llm_cache", llms.OrderedDict())
+    calls = []
+
+    def fake_generate(payload, timeout_seconds=None):
+        calls.append(payload)
+        return True, {"response": '{"tip": "save"}'}, None
+
+    monkeypatch.setattr(llms, "_post_ollama_generate", fake_generate)
+
+    assert llms.generate_json("prompt", cache=True)["data"] == {"tip": "save"}
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    # A fresh process (empty memory cache) is answered from disk.
+    monkeypatch.setattr(llms, "_llm_cache", llms.OrderedDict())
+    assert llms.generate_json("prompt", cache=True)["data"] == {"tip": "save"}
+    assert len(calls) == 1
+
+
+def test_generate_json_sends_ollama_generation_options(llms, monkeypatch):
+    monkeypatch.setattr(llms, "OPENAI_API_KEY", "")
+    monkeypatch.setattr(llms, "_llm_cache", llms.OrderedDict())
+    payloads = []
+
+    def fake_generate(payload, timeout_seconds=None):
+        payloads.append(payload)
+        return True, {"response": "{}"}, None
+
+    monkeypatch.setattr(llms, "_post_ollama_generate", fake_generate)
+
+    llms.generate_json("p", max_tokens=512, context_tokens=4096)
+    monkeypatch.setattr(llms, "OLLAMA_NUM_CTX", 16384)
+    llms.generate_json("p", max_tokens=512, context_tokens=4096)
+    llms.generate_json("q")
+
+    assert payloads[0]["options"] == {"num_predict": 512, "num_ctx": 4096}
+    assert payloads[1]["options"] == {"num_predict": 512, "num_ctx": 16384}
+    assert payloads[2]["options"] == {"num_ctx": 16384}
+
+
+def test_generate_json_does_not_cache_by_default(llms, monkeypatch):
+    monkeypatch.setattr(llms, "OPENAI_API_KEY", "")
+    monkeypatch.setattr(llms, "_llm_cache", llms.OrderedDict())
+    calls = []
+
+    def fake_generate(payload, timeout_seconds=None):
+        calls.append(payload)
+        return True, {"response": '{"tip": %d}' % len(calls)}, None
+
+    monkeypatch.setattr(llms, "_post_ollama_generate", fake_generate)
+
+    assert llms.generate_json("prompt")["data"] == {"tip": 1}
+    assert llms.generate_json("prompt")["data"] == {"tip": 2}
+    assert len(llms._llm_cache) == 0
@@ -31,3 +31,21 @@ def test_parse_transaction_file_extracts_rows(tmp_path, add_web_to_syspath):
     assert tx0["date"] == "2024-01-01"
     assert isinstance(tx0["amount"], float)
 
+
+
+def test_parse_transaction_file_accepts_unpadded_dates_and_skips_bad_ones(tmp_path, add_web_to_syspath):
+    app = _import_app_or_skip()
+
+    sample = (
+        "Date: 2024-1-5, Name: BAKERY, Amount: $-4.25, Account: Checking\n"
+        "Date: 2024-13-01, Name: BAD DATE, Amount: $-1.00\n"
+        "Date: 2024-01-06, Name: BOOKSTORE , Amount: $-12.00\n"
+    )
+    file_path = tmp_path / "transactions_2024-01.txt"
+    file_path.write_text(sample)
+
+    result = app.parse_transaction_file(str(file_path))
+
+    assert [tx["name"] for tx in result["transactions"]] == ["BAKERY", "BOOKSTORE"]
+    assert result["transactions"][0]["datetime"].day == 5
+    assert result["transactions"][0]["account_name"] == "Checking"
@@ -0,0 +1,173 @@
+import pytest
+
+
+def _module_or_skip():
+    try:
+        import src.api.spending_benchmarks as module
+    except Exception as e:
+        pytest.skip(f"Skipping: unable to import spending_benchmarks: {e}")
+    return module
+
+
+@pytest.mark.parametrize(
+    "merchant, description, expected",
+    [
+        ("GEICO *AUTO", "", "car_insurance"),
+        ("Starbucks Store 123", "", "dining_out"),
+        ("TRADER JOE'S #552", "", "groceries"),
+        ("STOP & SHOP 0412", "", "groceries"),
+        ("AT&T BILL PAY", "", "utilities"),
+        ("Unknown Merchant", "Dunkin order", "dining_out"),
+        # Earlier categories keep priority even when they appear later in the text.
+        ("STARBUCKS", "paid with GEICO rewards", "car_insurance"),
+        ("WALMART", "XFINITY prepaid card", "groceries"),
+        ("MCDONALDSVILLE HARDWARE", "", "other"),
+        ("", "", "other"),
+    ],
+)
+def test_classify_transaction_keywords(merchant, description, expected):
+    module = _module_or_skip()
+    assert module.classify_transaction(merchant, description) == expected
+
+
+def test_classify_transaction_prefers_explicit_category():
+    module = _module_or_skip()
+    assert module.classify_transaction("GEICO", explicit_category="Restaurants") == "dining_out"
+    assert module.classify_transaction("GEICO", explicit_category="Home Improvement") == "home_improvement"
+
+
+def test_monthly_spend_by_category_classifies_each_merchant_once(monkeypatch):
+    module = _module_or_skip()
+    calls = []
+    real_classify = module.classify_texts
+    monkeypatch.setattr(module, "classify_texts", lambda texts: calls.append(texts) or real_classify(texts))
+
+    transactions = [
+        {"name": "STARBUCKS", "amount": -4.5},
+        {"name": "STARBUCKS", "amount": -5.5},
+        {"merchant": "KROGER", "name": "ignored", "amount": -60},
+        {"name": "PAYROLL", "amount": 2000},
+        {"name": "GEICO", "amount": -100, "category": "Auto"},
+    ]
+
+    totals = module.monthly_spend_by_category(transactions)
+
+    assert totals == {"dining_out": 10.0, "groceries": 60.0, "car_insurance": 100.0}
+    assert calls == [["STARBUCKS ", "KROGER "]]
+
+
+def test_classify_texts_matches_single_classification():
+    module = _module_or_skip()
+    rows = [
+        ("GEICO *AUTO", ""),
+        ("STARBUCKS", "paid with GEICO rewards"),
+        ("Unknown", ""),
+        ("", "Dunkin order"),
+        ("state", "farm"),  # keywords must not match across row boundaries either
+        ("farm", ""),
+        ("WALMART", "XFINITY prepaid card"),
+        ("", ""),
+    ]
+    texts = [f"{merchant} {description}" for merchant, description in rows]
+
+    assert module.classify_texts(texts) == [module.classify_transaction(m, d) for m, d in rows]
+    assert module.classify_texts([]) == []
+
+
+def test_llm_prompt_includes_compact_spend_json(monkeypatch):
+    module = _module_or_skip()
+    monkeypatch.setattr(module, "_benchmark_cache", module.OrderedDict())
+    prompts = []
+
+    def fake_generate_json(prompt, **kwargs):
+        prompts.append(prompt)
+        return {"success": True, "data": {"comparisons": []}}
+
+    monkeypatch.setattr(module, "_get_llm_generate_json", lambda: fake_generate_json)
+
+    # "utilities" is requested but absent from user_spend; it should be reported as 0.
+    result = module.generate_benchmark_comparison_with_llm(
+        {"groceries": 412.339, "dining_out": 80}, state="nj", categories=["groceries", "utilities"]
+    )
+
+    assert result == {"comparisons": [], "region": "NJ"}
+    assert '{"groceries":412.34,"utilities":0.0}' in prompts[0]
+
+
+@pytest.mark.parametrize(
+    "label, expected",
+    [
+        ("Restaurants", "dining_out"),
+        (" car insurance ", "car_insurance"),
+        ("Supermarket", "groceries"),
+        ("Internet", "utilities"),
+        ("Home & Garden", "home_garden"),
+        ("", "other"),
+        (None, "other"),
+    ],
+)
+def test_normalize_category(label, expected):
+    module = _module_or_skip()
+    assert module.normalize_category(label) == expected
+
+
+def test_llm_benchmark_results_are_cached_until_ttl(monkeypatch):
+    module = _module_or_skip()
+    monkeypatch.setattr(module, "_benchmark_cache", module.OrderedDict())
+    clock = [1000.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: clock[0])
+    calls = []
+
+    def fake_generate_json(prompt, **kwargs):
+        calls.append(prompt)
+        return {"success": True, "data": {"comparisons": [{"category": "groceries"}]}}
+
+    monkeypatch.setattr(module, "_get_llm_generate_json", lambda: fake_generate_json)
+
+    first = module.generate_benchmark_comparison_with_llm({"groceries": 400.001}, state="NJ")
+    first["comparisons"].clear()  # callers get their own copy
+    second = module.generate_benchmark_comparison_with_llm({"groceries": 400.0}, state="nj")
+
+    assert len(calls) == 1
+    assert second == {"comparisons": [{"category": "groceries"}], "region": "NJ"}
+
+    clock[0] += module._BENCHMARK_CACHE_TTL_SECONDS + 1
+    module.generate_benchmark_comparison_with_llm({"groceries": 400.0}, state="NJ")
+    assert len(calls) == 2
+
+
+def test_llm_benchmark_failures_are_not_cached(monkeypatch):
+    module = _module_or_skip()
+    monkeypatch.setattr(module, "_benchmark_cache", module.OrderedDict())
+    calls = []
+    monkeypatch.setattr(
+        module, "_get_llm_generate_json", lambda: lambda prompt, **kwargs: calls.append(prompt) or {"success": False}
+    )
+
+    for _ in range(2):
+        result = module.generate_benchmark_comparison_with_llm({"groceries": 400.0}, state="NJ")
+        assert "LLM unavailable" in result["disclaimer"]
+    assert len(calls) == 2
+
+
+def test_llm_benchmark_skipped_when_there_is_no_spend(monkeypatch):
+    module = _module_or_skip()
+    monkeypatch.setattr(module, "_benchmark_cache", module.OrderedDict())
+    calls = []
+    monkeypatch.setattr(
+        module, "_get_llm_generate_json", lambda: lambda prompt, **kwargs: calls.append(prompt) or {"success": True, "data": {}}
+    )
+
+    for spend in ({}, {"groceries": 0.0, "dining_out": 0.001}):
+        result = module.generate_benchmark_comparison_with_llm(spend, state="NJ")
+        assert result == {
+            "region": "NJ",
+            "comparisons": [],
+            "highlights": [],
+            "disclaimer": "No spending to compare for this period.",
+        }
+    assert calls == []
+
+    # Explicitly requested categories still go to the model for their averages.
+    module.generate_benchmark_comparison_with_llm({}, state="NJ", categories=["groceries"])
+    assert len(calls) == 1